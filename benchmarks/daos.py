@@ -0,0 +1,149 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""DAO stand-ins serving a synthetic Dataset instead of querying PostgreSQL"""
+
+import contextlib
+from types import SimpleNamespace
+from unittest.mock import patch
+
+_EXTENFEATURES = ('bsfilter', 'fwdbusy', 'fwdrna', 'fwdunc', 'phoneprogfunckey')
+
+
+class AsteriskConfDao:
+    def __init__(self, dataset):
+        self._dataset = dataset
+
+    def find_extenfeatures_settings(self, features=None):
+        return [
+            SimpleNamespace(feature=feature, exten=f'_*{i}.', enabled=True)
+            for i, feature in enumerate(_EXTENFEATURES, start=20)
+        ]
+
+    def find_context_settings(self):
+        return self._dataset.contexts
+
+    def find_exten_xivofeatures_setting(self):
+        return [{'exten': '*10', 'enabled': True, 'feature': 'phonestatus'}]
+
+    def find_sip_user_settings(self):
+        # the DAO returns a new list on each call
+        return list(self._dataset.sip_users)
+
+    def find_sip_trunk_settings(self):
+        return []
+
+    def find_sip_meeting_guests_settings(self):
+        return []
+
+    def find_queue_general_settings(self):
+        return [{'var_name': 'autofill', 'var_val': 'yes'}]
+
+    def find_queue_settings(self):
+        return [dict(queue) for queue in self._dataset.queues]
+
+    def find_sccp_general_settings(self):
+        return [{'option_name': 'dialtimeout', 'option_value': '6'}]
+
+    def find_sccp_line_settings(self):
+        return self._dataset.sccp_lines
+
+    def find_sccp_device_settings(self):
+        return self._dataset.sccp_devices
+
+    def find_sccp_speeddial_settings(self):
+        return self._dataset.sccp_speeddials
+
+    def find_voicemail_general_settings(self):
+        return [{'category': 'general', 'var_name': 'maxmsg', 'var_val': '100'}]
+
+
+class BulkDao:
+    def __init__(self, dataset):
+        self._dataset = dataset
+
+    def find_contextincludes_settings_by_context(self):
+        return self._dataset.context_includes
+
+    def find_exten_settings_by_context(self):
+        return self._dataset.extensions
+
+    def find_queue_members_settings_by_queue(self):
+        return self._dataset.queue_members
+
+
+class HintDao:
+    def __init__(self, dataset):
+        self._dataset = dataset
+
+    def progfunckey_extension(self):
+        return '*735'
+
+    def user_hints(self):
+        return self._dataset.user_hints
+
+    def user_shared_hints(self):
+        return []
+
+    def conference_hints(self):
+        return {}
+
+    def service_hints(self):
+        return {}
+
+    def forward_hints(self):
+        return {}
+
+    def groupmember_hints(self):
+        return {}
+
+    def agent_hints(self):
+        return {}
+
+    def bsfilter_hints(self):
+        return {}
+
+    def custom_hints(self):
+        return {}
+
+
+class IVRDao:
+    def find_all_by(self, **kwargs):
+        return []
+
+
+class AsteriskFileDao:
+    def find_by(self, **kwargs):
+        return None
+
+
+class TransportDao:
+    def search(self, **kwargs):
+        transport = SimpleNamespace(
+            name='transport-udp',
+            options=[['protocol', 'udp'], ['bind', '0.0.0.0:5060']],
+        )
+        return SimpleNamespace(total=1, items=[transport])
+
+
+@contextlib.contextmanager
+def stand_in_daos(dataset):
+    asterisk_conf_dao = AsteriskConfDao(dataset)
+    bulk_dao = BulkDao(dataset)
+    targets = {
+        'wazo_confgend.generators.extensionsconf.asterisk_conf_dao': asterisk_conf_dao,
+        'wazo_confgend.generators.extensionsconf.bulk_dao': bulk_dao,
+        'wazo_confgend.generators.extensionsconf.ivr_dao': IVRDao(),
+        'wazo_confgend.generators.queues.asterisk_conf_dao': asterisk_conf_dao,
+        'wazo_confgend.generators.queues.bulk_dao': bulk_dao,
+        'wazo_confgend.generators.sccp.asterisk_conf_dao': asterisk_conf_dao,
+        'wazo_confgend.generators.voicemail.asterisk_conf_dao': asterisk_conf_dao,
+        'wazo_confgend.hints.generator.hint_dao': HintDao(dataset),
+        'wazo_confgend.plugins.pjsip_conf.asterisk_conf_dao': asterisk_conf_dao,
+        'wazo_confgend.plugins.pjsip_conf.asterisk_file_dao': AsteriskFileDao(),
+        'wazo_confgend.plugins.pjsip_conf.transport_dao': TransportDao(),
+    }
+    with contextlib.ExitStack() as stack:
+        for target, dao in targets.items():
+            stack.enter_context(patch(target, dao))
+        yield
@@ -0,0 +1,198 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Synthetic large-tenant dataset, shaped like the rows returned by the DAOs"""
+
+import uuid
+from collections import defaultdict
+from types import SimpleNamespace
+
+
+class Dataset:
+    def __init__(
+        self,
+        tenants,
+        users_per_tenant=100,
+        queues_per_tenant=5,
+        sccp_devices_per_tenant=10,
+        speeddials_per_device=5,
+    ):
+        self.tenants = tenants
+        self.users_per_tenant = users_per_tenant
+        self.queues_per_tenant = queues_per_tenant
+        self.sccp_devices_per_tenant = sccp_devices_per_tenant
+        self.speeddials_per_device = speeddials_per_device
+
+        self.contexts = []
+        self.context_includes = defaultdict(list)
+        self.extensions = defaultdict(list)
+        self.user_hints = defaultdict(list)
+        self.sip_users = []
+        self.queues = []
+        self.queue_members = defaultdict(list)
+        self.sccp_lines = []
+        self.sccp_devices = []
+        self.sccp_speeddials = []
+        self.voicemails = []
+
+        for tenant in range(tenants):
+            self._add_tenant(tenant)
+
+    def describe(self):
+        return {
+            'tenants': self.tenants,
+            'contexts': len(self.contexts),
+            'users': self.tenants * self.users_per_tenant,
+            'queues': len(self.queues),
+            'sccp_devices': len(self.sccp_devices),
+            'voicemails': len(self.voicemails),
+        }
+
+    def _add_tenant(self, tenant):
+        tenant_uuid = str(uuid.UUID(int=tenant))
+        internal = f'ctx-{tenant}-internal'
+        incall = f'ctx-{tenant}-incall'
+        outcall = f'ctx-{tenant}-outcall'
+        for name, contexttype in (
+            (internal, 'internal'),
+            (incall, 'incall'),
+            (outcall, 'outcall'),
+        ):
+            self.contexts.append(
+                {'name': name, 'contexttype': contexttype, 'tenant_uuid': tenant_uuid}
+            )
+        self.context_includes[internal].append({'include': outcall})
+
+        for user in range(self.users_per_tenant):
+            self._add_user(tenant, tenant_uuid, user, internal, incall)
+
+        for queue in range(self.queues_per_tenant):
+            name = f'queue-{tenant}-{queue}'
+            self.queues.append(
+                {
+                    'name': name,
+                    'label': f'Queue {queue}',
+                    'category': 'queue',
+                    'commented': 0,
+                    'timeout': 15,
+                    'strategy': 'ringall',
+                    'joinempty': '',
+                }
+            )
+            for user in range(0, self.users_per_tenant, 10):
+                self.queue_members[name].append(
+                    (f'PJSIP/user-{tenant}-{user}', '0', '', '')
+                )
+
+        for device in range(self.sccp_devices_per_tenant):
+            self._add_sccp_device(tenant, tenant_uuid, device, internal)
+
+    def _add_user(self, tenant, tenant_uuid, user, internal, incall):
+        user_id = tenant * self.users_per_tenant + user
+        number = str(1000 + user)
+        name = f'user-{tenant}-{user}'
+
+        self.extensions[internal].append(
+            {
+                'id': user_id,
+                'type': 'user',
+                'context': internal,
+                'exten': number,
+                'typeval': str(user_id),
+                'tenant_uuid': tenant_uuid,
+            }
+        )
+        if user % 10 == 0:
+            self.extensions[incall].append(
+                {
+                    'id': user_id,
+                    'type': 'incall',
+                    'context': incall,
+                    'exten': f'+1555{user_id:07d}',
+                    'typeval': str(user_id),
+                    'tenant_uuid': tenant_uuid,
+                }
+            )
+        self.user_hints[internal].append(
+            SimpleNamespace(user_id=user_id, extension=number, argument=f'PJSIP/{name}')
+        )
+        self.sip_users.append(
+            {
+                'name': name,
+                'label': f'User {user}',
+                'endpoint_section_options': [
+                    ['type', 'endpoint'],
+                    ['context', internal],
+                    ['aors', name],
+                    ['auth', name],
+                    ['allow', '!all,ulaw,alaw'],
+                    ['set_var', f'WAZO_TENANT_UUID={tenant_uuid}'],
+                ],
+                'aor_section_options': [
+                    ['type', 'aor'],
+                    ['max_contacts', '1'],
+                    ['qualify_frequency', '60'],
+                ],
+                'auth_section_options': [
+                    ['type', 'auth'],
+                    ['username', name],
+                    ['password', 'secret'],
+                ],
+            }
+        )
+        self.voicemails.append(
+            SimpleNamespace(
+                number=number,
+                context=internal,
+                password='1234',
+                name=f'User {user}',
+                email=f'{name}@example.com',
+                pager=None,
+                language='en_US',
+                timezone='eu-fr',
+                attach_audio=True,
+                delete_messages=False,
+                max_messages=100,
+                options=[['saycid', 'yes']],
+            )
+        )
+
+    def _add_sccp_device(self, tenant, tenant_uuid, device, internal):
+        user_id = tenant * self.users_per_tenant + device
+        line = f'sccp-{tenant}-{device}'
+        device_name = f'SEP{tenant:06d}{device:06d}'
+        self.sccp_lines.append(
+            {
+                'id': user_id,
+                'name': line,
+                'cid_name': f'SCCP {device}',
+                'cid_num': line,
+                'user_id': user_id,
+                'uuid': str(uuid.UUID(int=user_id)),
+                'tenant_uuid': tenant_uuid,
+                'number': line,
+                'context': internal,
+                'simultcalls': 5,
+                'enable_online_recording': 0,
+                'language': 'en_US',
+            }
+        )
+        self.sccp_devices.append(
+            {
+                'name': device_name,
+                'device': device_name,
+                'line': line,
+                'voicemail': line,
+            }
+        )
+        for fknum in range(self.speeddials_per_device, 0, -1):
+            self.sccp_speeddials.append(
+                {
+                    'exten': str(1000 + fknum),
+                    'fknum': fknum,
+                    'label': f'Speed dial {fknum}',
+                    'supervision': 1,
+                    'user_id': user_id,
+                    'device': device_name,
+                }
+            )
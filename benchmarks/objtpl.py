@@ -0,0 +1,71 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Micro-benchmark of the objtpl rendering of extensions.conf
+
+usage: python -m benchmarks.objtpl [extension count]
+"""
+
+import sys
+import timeit
+
+from wazo_confgend.generators.contextsconf import DialplanTemplate
+
+OBJTPL = (
+    '%%EXTEN%%,%%PRIORITY%%,Set(__WAZO_BASE_CONTEXT=${CONTEXT})',
+    'n,Set(__XIVO_BASE_EXTEN=${EXTEN})',
+    'n,Set(__WAZO_TENANT_UUID=%%TENANT_UUID%%)',
+    'n,GoSub(contextlib,entry-exten-context,1)',
+    'n,%%ACTION%%',
+)
+
+
+def render_with_replace(template, exten):
+    # rendering used before the objtpl lines were compiled
+    lines = []
+    for line in template:
+        prefix, padding = (
+            ('exten', '') if line.startswith('%%EXTEN%%') else ('same ', '    ')
+        )
+        line = line.replace('%%CONTEXT%%', str(exten.get('context', '')))
+        line = line.replace('%%EXTEN%%', str(exten.get('exten', '')))
+        line = line.replace('%%PRIORITY%%', str(exten.get('priority', '')))
+        line = line.replace('%%ACTION%%', str(exten.get('action', '')))
+        line = line.replace('%%TENANT_UUID%%', str(exten.get('tenant_uuid', '')))
+        lines.append(f'{prefix} = {padding}{line}'.strip())
+    lines.append('\n')
+    return '\n'.join(lines)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    extens = [
+        {
+            'context': f'ctx-{i % 3000}',
+            'exten': str(1000 + i),
+            'priority': 1,
+            'action': f'GoSub(user,s,1({i},,{i}))',
+            'tenant_uuid': '2b853b5b-6c19-4123-90da-3ce05fe9aa74',
+        }
+        for i in range(count)
+    ]
+    template = DialplanTemplate(OBJTPL)
+
+    assert all(
+        template.render(exten) == render_with_replace(OBJTPL, exten)
+        for exten in extens[:1000]
+    )
+
+    replace_time = timeit.timeit(
+        lambda: [render_with_replace(OBJTPL, exten) for exten in extens], number=1
+    )
+    compiled_time = timeit.timeit(
+        lambda: [template.render(exten) for exten in extens], number=1
+    )
+    print(f'{count} extensions')
+    print(f'  str.replace: {replace_time:.3f} s')
+    print(f'  compiled:    {compiled_time:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Generator throughput on synthetic datasets of growing size
+
+Each measurement runs in a fresh process, so that the reported peak RSS only
+accounts for one generator at one scale.
+
+usage: python -m benchmarks.run [--scales 1,10,100] [--output results.json]
+"""
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from benchmarks.daos import stand_in_daos
+from benchmarks.dataset import Dataset
+from wazo_confgend.generators.extensionsconf import ExtensionsConf
+from wazo_confgend.generators.queues import QueuesConf
+from wazo_confgend.generators.sccp import SccpConf
+from wazo_confgend.generators.voicemail import VoicemailConf, VoicemailGenerator
+from wazo_confgend.hints.generator import HintGenerator
+from wazo_confgend.plugins.pjsip_conf import PJSIPConfGenerator
+from wazo_confgend.template import new_template_helper
+
+CONTEXTS_CONF = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'etc/wazo-confgend/templates/contexts.conf',
+)
+
+
+class _CountingOutput:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data.encode('utf-8'))
+
+
+def _generate_extensions_conf(output):
+    ExtensionsConf(
+        CONTEXTS_CONF, HintGenerator.build(), new_template_helper()
+    ).generate(output)
+
+
+def _generate_pjsip_conf(output):
+    PJSIPConfGenerator(dependencies=None).generate(output)
+
+
+def _generate_queues_conf(output):
+    QueuesConf().generate(output)
+
+
+def _generate_sccp_conf(output):
+    SccpConf().generate(output)
+
+
+def _generate_voicemail_conf(output, dataset):
+    VoicemailConf(VoicemailGenerator(dataset.voicemails)).generate(output)
+
+
+def _generate_hints(output, dataset):
+    generator = HintGenerator.build()
+    for context in dataset.contexts:
+        for line in generator.generate(context['name']):
+            output.write(f'{line}\n')
+
+
+GENERATORS = {
+    'extensions.conf': _generate_extensions_conf,
+    'pjsip.conf': _generate_pjsip_conf,
+    'queues.conf': _generate_queues_conf,
+    'sccp.conf': _generate_sccp_conf,
+    'voicemail.conf': _generate_voicemail_conf,
+    'hints': _generate_hints,
+}
+_WITH_DATASET = ('voicemail.conf', 'hints')
+
+
+def _max_rss_kib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(generator_name, tenants, dataset_options):
+    dataset = Dataset(tenants, **dataset_options)
+    generate = GENERATORS[generator_name]
+    args = (dataset,) if generator_name in _WITH_DATASET else ()
+    output = _CountingOutput()
+
+    rss_before = _max_rss_kib()
+    with stand_in_daos(dataset):
+        start = time.perf_counter()
+        generate(output, *args)
+        wall_time = time.perf_counter() - start
+    peak_rss = _max_rss_kib()
+
+    return {
+        'generator': generator_name,
+        'dataset': dataset.describe(),
+        'wall_time': wall_time,
+        'peak_rss_kib': peak_rss,
+        'peak_rss_increase_kib': peak_rss - rss_before,
+        'output_bytes': output.size,
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--scales',
+        default='1,10,100',
+        help='comma separated numbers of tenants (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--generators',
+        default=','.join(GENERATORS),
+        help='comma separated generators to run (default: all)',
+    )
+    parser.add_argument('--users-per-tenant', type=int, default=100)
+    parser.add_argument('--queues-per-tenant', type=int, default=5)
+    parser.add_argument('--sccp-devices-per-tenant', type=int, default=10)
+    parser.add_argument('--output', help='file where to write the JSON results')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    scales = [int(scale) for scale in args.scales.split(',')]
+    generators = args.generators.split(',')
+    for generator_name in generators:
+        if generator_name not in GENERATORS:
+            sys.exit(f'unknown generator: {generator_name}')
+    dataset_options = {
+        'users_per_tenant': args.users_per_tenant,
+        'queues_per_tenant': args.queues_per_tenant,
+        'sccp_devices_per_tenant': args.sccp_devices_per_tenant,
+    }
+
+    results = []
+    mp_context = multiprocessing.get_context('spawn')
+    for generator_name in generators:
+        for tenants in scales:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=mp_context
+            ) as executor:
+                result = executor.submit(
+                    measure, generator_name, tenants, dataset_options
+                ).result()
+            results.append(result)
+            print(
+                f"{generator_name:<16} {tenants:>6} tenants"
+                f" {result['wall_time']:>9.3f} s"
+                f" {result['peak_rss_kib'] / 1024:>9.1f} MiB peak RSS"
+                f" (+{result['peak_rss_increase_kib'] / 1024:.1f} MiB)"
+                f" {result['output_bytes']:>12} bytes"
+            )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmark of the voicemail section of voicemail.conf
+
+usage: python -m benchmarks.voicemail [mailbox count]
+"""
+
+import io
+import sys
+import time
+from types import SimpleNamespace
+
+from wazo_confgend.generators.voicemail import VoicemailGenerator
+
+
+def new_voicemail(i, context):
+    return SimpleNamespace(
+        number=str(1000 + i),
+        context=context,
+        password='1234',
+        name=f'voicemail {i}',
+        email=f'user{i}@example.com',
+        pager=None,
+        language='en_US',
+        timezone='eu-fr',
+        attach_audio=True,
+        delete_messages=False,
+        max_messages=100,
+        options=[['saycid', 'yes']],
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    voicemails = [new_voicemail(i, f'ctx-{i // 100}') for i in range(count)]
+    generator = VoicemailGenerator(voicemails)
+
+    output = io.StringIO()
+    start = time.perf_counter()
+    generator.generate(output)
+    elapsed = time.perf_counter() - start
+
+    print(f'{count} mailboxes: {elapsed:.3f} s, {output.tell()} characters')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 #!/usr/bin/env python
-# Copyright 2016-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from setuptools import find_packages, setup
@@ -13,7 +13,7 @@ setup(
     url='http://wazo-platform.org',
     license='GPLv3',
     include_package_data=True,
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     scripts=['bin/wazo-confgend'],
     entry_points={
         'wazo_confgend.asterisk.confbridge.conf': [
@@ -1,4 +1,4 @@
-# Copyright 2010-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2010-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
@@ -13,6 +13,7 @@ from wazo_confgend.generators.res_parking import ResParkingConf
 from wazo_confgend.generators.sccp import SccpConf
 from wazo_confgend.generators.util import AsteriskFileWriter
 from wazo_confgend.generators.voicemail import VoicemailConf, VoicemailGenerator
+from wazo_confgend.handler import streamable
 from wazo_confgend.hints.generator import HintGenerator
 
 
@@ -21,38 +22,48 @@ class AsteriskFrontend:
         self.contextsconf = config['templates']['contextsconf']
         self._tpl_helper = tpl_helper
 
-    def res_parking_conf(self):
+    @streamable
+    def res_parking_conf(self, output=None):
         config_generator = ResParkingConf()
-        return self._generate_conf_from_generator(config_generator)
+        return self._generate_conf_from_generator(config_generator, output)
 
-    def sccp_conf(self):
+    @streamable
+    def sccp_conf(self, output=None):
         config_generator = SccpConf()
-        return self._generate_conf_from_generator(config_generator)
+        return self._generate_conf_from_generator(config_generator, output)
 
-    def voicemail_conf(self):
+    @streamable
+    def voicemail_conf(self, output=None):
         voicemail_generator = VoicemailGenerator.build()
         config_generator = VoicemailConf(voicemail_generator)
-        return self._generate_conf_from_generator(config_generator)
+        return self._generate_conf_from_generator(config_generator, output)
 
-    def extensions_conf(self):
+    @streamable
+    def extensions_conf(self, output=None):
         hint_generator = HintGenerator.build()
         config_generator = ExtensionsConf(
             self.contextsconf, hint_generator, self._tpl_helper
         )
-        return self._generate_conf_from_generator(config_generator)
+        return self._generate_conf_from_generator(config_generator, output)
 
-    def queues_conf(self):
+    @streamable
+    def queues_conf(self, output=None):
         config_generator = QueuesConf()
-        return self._generate_conf_from_generator(config_generator)
+        return self._generate_conf_from_generator(config_generator, output)
+
+    def _generate_conf_from_generator(self, config_generator, output=None):
+        if output is not None:
+            config_generator.generate(output)
+            return
 
-    def _generate_conf_from_generator(self, config_generator):
         output = StringIO()
         config_generator.generate(output)
         return output.getvalue()
 
-    def iax_conf(self):
+    @streamable
+    def iax_conf(self, output=None):
         config_generator = IaxConf()
-        return self._generate_conf_from_generator(config_generator)
+        return self._generate_conf_from_generator(config_generator, output)
 
     def queueskills_conf(self):
         """Generate queueskills.conf asterisk configuration file"""
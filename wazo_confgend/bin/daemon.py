@@ -1,4 +1,4 @@
-# Copyright 2016-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -8,9 +8,12 @@ from twisted.application import internet, service
 from twisted.internet import reactor
 from twisted.python import log
 from xivo import xivo_logging
+from xivo_dao import asterisk_conf_dao
 
-from wazo_confgend.confgen import ConfgendFactory
+from wazo_confgend import bulk_dao, querylog, timing
+from wazo_confgend.confgen import ConfgendFactory, FramedConfgendFactory
 from wazo_confgend.config import load as load_config
+from wazo_confgend.metrics import MetricsSite
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +26,12 @@ def main():
     )
 
     xivo_dao.init_db(config['db_uri'])
+    _instrument(config)
     f = ConfgendFactory(config['cache'], config)
 
-    logger.info(
-        "Listening to TCP port %s on address %s",
-        config['listen_port'],
-        config['listen_address'],
-    )
-    reactor.listenTCP(config['listen_port'], f, interface=config['listen_address'])
+    for server in _new_servers(config, f):
+        server.startService()
+    _schedule_warm_up(config, f)
     logger.info("Starting Twisted Reactor")
     reactor.run()
 
@@ -43,18 +44,93 @@ def twisted_application():
     )
 
     xivo_dao.init_db(config['db_uri'])
+    _instrument(config)
     f = ConfgendFactory(config['cache'], config)
 
     application = service.Application('confgend')
 
-    svc = internet.TCPServer(
-        config['listen_port'], f, interface=config['listen_address']
-    )
-    svc.setServiceParent(application)
+    for server in _new_servers(config, f):
+        server.setServiceParent(application)
+    _schedule_warm_up(config, f)
 
     return application
 
 
+def _instrument(config):
+    timing.instrument_queries()
+    if config['slow_generation_threshold']:
+        querylog.instrument_queries()
+        querylog.instrument_dao(asterisk_conf_dao)
+        querylog.instrument_dao(bulk_dao)
+
+
+def _schedule_warm_up(config, factory):
+    warm_up = config['warm_up']
+    if not warm_up.get('enabled'):
+        return
+
+    files = warm_up.get('files', [])
+    logger.info("Warming up %d files", len(files))
+    reactor.callWhenRunning(factory.warm_up, files)
+
+
+def _new_servers(config, factory):
+    servers = []
+    if config['listen_port']:
+        logger.info(
+            "Listening to TCP port %s on address %s",
+            config['listen_port'],
+            config['listen_address'],
+        )
+        servers.append(
+            internet.TCPServer(
+                config['listen_port'], factory, interface=config['listen_address']
+            )
+        )
+    if config['framed_listen_port']:
+        logger.info(
+            "Listening to framed TCP port %s on address %s",
+            config['framed_listen_port'],
+            config['listen_address'],
+        )
+        servers.append(
+            internet.TCPServer(
+                config['framed_listen_port'],
+                FramedConfgendFactory(factory),
+                interface=config['listen_address'],
+            )
+        )
+    if config['listen_unix']:
+        logger.info(
+            "Listening to UNIX socket %s with mode %o",
+            config['listen_unix'],
+            config['listen_unix_mode'],
+        )
+        # wantPID removes the socket left behind by a previous instance
+        servers.append(
+            internet.UNIXServer(
+                config['listen_unix'],
+                factory,
+                mode=config['listen_unix_mode'],
+                wantPID=True,
+            )
+        )
+    if config['metrics_listen_port']:
+        logger.info(
+            "Serving metrics on TCP port %s on address %s",
+            config['metrics_listen_port'],
+            config['metrics_listen_address'],
+        )
+        servers.append(
+            internet.TCPServer(
+                config['metrics_listen_port'],
+                MetricsSite(factory.metrics.registry),
+                interface=config['metrics_listen_address'],
+            )
+        )
+    return servers
+
+
 # given in command line to redirect logs to standard logging
 def twistd_logs():
     return log.PythonLoggingObserver().emit
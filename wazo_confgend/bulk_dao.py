@@ -0,0 +1,84 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Bulk variants of the per-context and per-queue asterisk_conf_dao queries.
+
+Each function loads the rows of every context (or queue) in a single query and
+returns them grouped by name, in the order the per-name query returns them.
+"""
+
+from collections import defaultdict
+
+from xivo_dao.alchemy.context import Context
+from xivo_dao.alchemy.contextinclude import ContextInclude
+from xivo_dao.alchemy.extension import Extension
+from xivo_dao.alchemy.queuemember import QueueMember
+from xivo_dao.alchemy.userfeatures import UserFeatures
+from xivo_dao.helpers.db_manager import daosession
+
+
+@daosession
+def find_contextincludes_settings_by_context(session):
+    rows = session.query(ContextInclude).order_by(
+        ContextInclude.context, ContextInclude.priority
+    )
+
+    result = defaultdict(list)
+    for row in rows:
+        result[row.context].append(row.todict())
+    return result
+
+
+@daosession
+def find_exten_settings_by_context(session):
+    rows = (
+        session.query(Extension, Context.tenant_uuid)
+        .join(Context, Context.name == Extension.context)
+        .filter(Extension.commented == 0)
+        .filter(Extension.typeval != '0')
+        .order_by(Extension.context, Extension.exten)
+    )
+
+    result = defaultdict(list)
+    for extension, tenant_uuid in rows:
+        exten = extension.todict()
+        exten['tenant_uuid'] = tenant_uuid
+        result[extension.context].append(exten)
+    return result
+
+
+def _group_queue_members(user_rows, other_rows):
+    # like the per-queue query, the users come first, then the other members
+    result = defaultdict(list)
+    for queue_name, penalty, user_uuid in user_rows:
+        result[queue_name].append(
+            (
+                f'Local/{user_uuid}@usersharedlines',
+                str(penalty),
+                '',
+                f'hint:{user_uuid}@usersharedlines',
+            )
+        )
+    for queue_name, penalty, interface in other_rows:
+        result[queue_name].append((interface, str(penalty), '', ''))
+    return result
+
+
+@daosession
+def find_queue_members_settings_by_queue(session):
+    user_rows = (
+        session.query(QueueMember.queue_name, QueueMember.penalty, UserFeatures.uuid)
+        .join(UserFeatures, UserFeatures.id == QueueMember.userid)
+        .filter(QueueMember.commented == 0)
+        .filter(QueueMember.usertype == 'user')
+        .order_by(QueueMember.queue_name, QueueMember.position)
+    )
+    other_rows = (
+        session.query(
+            QueueMember.queue_name, QueueMember.penalty, QueueMember.interface
+        )
+        .filter(QueueMember.commented == 0)
+        .filter(QueueMember.usertype != 'user')
+        .order_by(QueueMember.queue_name, QueueMember.position)
+    )
+    return _group_queue_members(user_rows, other_rows)
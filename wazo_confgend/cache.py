@@ -1,8 +1,22 @@
-# Copyright 2010-2022 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2010-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
+import hashlib
 import os.path
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+HASH_SUFFIX = '.blake2b'
+
+
+def content_hash(content):
+    # part of the protocol: the clients compute it to send if-none-match
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
 
 
 class Cache:
@@ -15,6 +29,28 @@ class Cache:
     def put(self, key, value):
         raise NotImplementedError()
 
+    def open_for_write(self, key):
+        raise NotImplementedError()
+
+    def get_mtime(self, key):
+        raise NotImplementedError()
+
+    def get_hash(self, key):
+        raise NotImplementedError()
+
+
+class _HashingWriter:
+    def __init__(self, fobj):
+        self._fobj = fobj
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def write(self, data):
+        self._hash.update(data.encode('utf-8'))
+        return self._fobj.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
 
 class FileCache(Cache):
     def __init__(self, basedir):
@@ -31,10 +67,11 @@ class FileCache(Cache):
 
     def invalidate(self, key):
         path = self._get_path_from_key(key)
-        try:
-            os.unlink(path)
-        except OSError:
-            return
+        for filename in (path, f'{path}{HASH_SUFFIX}'):
+            try:
+                os.unlink(filename)
+            except OSError:
+                continue
 
     def put(self, key, value):
         path = self._get_path_from_key(key)
@@ -44,9 +81,138 @@ class FileCache(Cache):
                 os.makedirs(dir)
             except Exception:
                 return False
-        with open(path, 'w') as f:
+        # a reader never sees a partially written entry
+        with self.open_for_write(key) as f:
             f.write(value)
         return True
 
+    @contextmanager
+    def open_for_write(self, key):
+        # the entry is replaced only once everything has been written
+        path = self._get_path_from_key(key)
+        dir = os.path.dirname(path)
+        os.makedirs(dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=dir, prefix='.tmp-')
+        try:
+            with open(fd, 'w') as f:
+                writer = _HashingWriter(f)
+                yield writer
+            # the old hash must never be read along with the new content
+            self._remove_hash(path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._put_hash(path, writer.hexdigest())
+
+    def get_mtime(self, key):
+        try:
+            return os.path.getmtime(self._get_path_from_key(key))
+        except OSError:
+            return None
+
+    def get_hash(self, key):
+        path = self._get_path_from_key(key)
+        try:
+            with open(f'{path}{HASH_SUFFIX}') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _remove_hash(self, path):
+        try:
+            os.unlink(f'{path}{HASH_SUFFIX}')
+        except FileNotFoundError:
+            pass
+
+    def _put_hash(self, path, hexdigest):
+        with open(f'{path}{HASH_SUFFIX}', 'w') as f:
+            f.write(hexdigest)
+
     def _get_path_from_key(self, key):
         return os.path.join(self.basedir, key)
+
+
+class MemoryCache(Cache):
+    """LRU cache of at most `max_size` bytes, written through to `backend`.
+
+    Entries are kept UTF-8 encoded, so get() returns bytes, even when the
+    entry is loaded from the backend.
+    """
+
+    def __init__(self, backend, max_size):
+        super().__init__()
+        self._backend = backend
+        self._max_size = max_size
+        self._size = 0
+        self._entries = OrderedDict()
+        # bumped on every write, so that a value read from the backend is not
+        # kept if any entry was written in the meantime
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+            writes = self._writes
+
+        value = self._backend.get(key)
+        if value is None:
+            return None
+        data = value.encode('utf-8')
+        self._store(key, data, writes)
+        return data
+
+    def invalidate(self, key):
+        self._discard(key)
+        self._backend.invalidate(key)
+        self._discard(key)
+
+    def put(self, key, value):
+        result = self._backend.put(key, value)
+        with self._lock:
+            self._writes += 1
+            self._store_locked(key, value.encode('utf-8'))
+        return result
+
+    @contextmanager
+    def open_for_write(self, key):
+        self._discard(key)
+        with self._backend.open_for_write(key) as f:
+            yield f
+        self._discard(key)
+
+    def get_mtime(self, key):
+        return self._backend.get_mtime(key)
+
+    def get_hash(self, key):
+        return self._backend.get_hash(key)
+
+    def _store(self, key, data, writes):
+        with self._lock:
+            if self._writes != writes:
+                return
+            self._store_locked(key, data)
+
+    def _store_locked(self, key, data):
+        self._discard_locked(key)
+        if len(data) > self._max_size:
+            return
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self._max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _discard(self, key):
+        with self._lock:
+            self._writes += 1
+            self._discard_locked(key)
+
+    def _discard_locked(self, key):
+        data = self._entries.pop(key, None)
+        if data is not None:
+            self._size -= len(data)
@@ -1,16 +1,34 @@
-# Copyright 2011-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
 
+import contextlib
 import logging
+import os
+import struct
+import threading
 import time
+from collections import OrderedDict
+from concurrent import futures
+from concurrent.futures import Future
 
 import twisted.python.failure
+from twisted.internet import defer, reactor, threads
 from twisted.internet.protocol import Protocol, ServerFactory
+from twisted.protocols.basic import LineReceiver
+from twisted.python.threadpool import ThreadPool
 from xivo_dao.helpers.db_utils import session_scope
 
-from wazo_confgend import cache
+from wazo_confgend import (
+    cache,
+    metrics,
+    profiling,
+    querylog,
+    snapshot,
+    streaming,
+    timing,
+)
 from wazo_confgend.asterisk import AsteriskFrontend
 from wazo_confgend.handler import (
     CachedHandlerFactoryDecorator,
@@ -18,6 +36,8 @@ from wazo_confgend.handler import (
     MultiHandlerFactory,
     NullHandlerFactory,
     PluginHandlerFactory,
+    is_null_handler,
+    is_streamable,
 )
 from wazo_confgend.phoned import PhonedFrontend
 from wazo_confgend.template import new_template_helper
@@ -25,8 +45,83 @@ from wazo_confgend.wazo import WazoFrontend
 
 logger = logging.getLogger(__name__)
 
+FRAME_HEADER = struct.Struct('!I')
+BUNDLE_COMMAND = 'bundle'
+IF_NONE_MATCH_PREFIX = 'if-none-match='
+# responses of a framed connection generated or waiting to be written
+MAX_PENDING_RESPONSES = 8
+# sent instead of the content when its hash, as computed by
+# cache.content_hash, matches the if-none-match argument
+NOT_MODIFIED = b'wazo-confgend: not modified\n'
+REQUEST_MODES = ('profile', 'invalidate', 'cached', 'swr', 'stream')
+TEMPLATE_BYTECODE_CACHE_DIR = '.jinja'
+DEFAULT_SLOW_GENERATION_TOP_QUERIES = 10
+DEFAULT_PROFILE_DIR = '.profiles'
+# arguments of a stream command that are served by a plain generation, like
+# if-none-match since the hash is only known once the whole file is generated
+NOT_STREAMED_ARGS = frozenset(['invalidate', 'cached', 'profile'])
+# timings and metrics of the files that are not served by a handler
+UNKNOWN_KEY = 'unknown'
+# names without a handler remembered to avoid looking them up again
+MAX_UNHANDLED_KEYS = 1000
+
+
+def _encode(content):
+    if isinstance(content, bytes):
+        return content
+    return content.encode("utf-8")
+
+
+def format_bundle(parts):
+    """Format the (name, content) parts of a bundle as one multi-part response.
+
+    Each part is a "<resource>/<filename> <length>\\n" header followed by
+    `length` bytes of UTF-8 encoded content. A length of 0 means that the file
+    could not be generated.
+    """
+    chunks = []
+    for name, content in parts:
+        data = _encode(content) if content else b''
+        chunks.append(f'{name} {len(data)}\n'.encode("utf-8"))
+        chunks.append(data)
+    return b''.join(chunks)
+
+
+def _get_request_mode(args):
+    for mode in REQUEST_MODES:
+        if mode in args:
+            return mode
+    return 'plain'
+
+
+def _get_etag(args):
+    for arg in args:
+        if arg.startswith(IF_NONE_MATCH_PREFIX):
+            return arg[len(IF_NONE_MATCH_PREFIX) :]
+
+
+def _content_size(content):
+    return len(content) if content else 0
+
+
+def parse_command_line(line: str) -> tuple[str, list[str]]:
+    if ' ' in line:
+        cmd, trailing = line.split(' ', 1)
+        args = [arg for arg in trailing.split(' ') if arg]
+    else:
+        cmd, args = line, []
+    return cmd, args
+
+
+def _log_served(factory, cmd, line, timer):
+    timer.stop()
+    logger.info("serving %s in %.3f seconds %s", line, timer.total, timer.format())
+    factory.record_timing(cmd, timer)
+
 
 class Confgen(Protocol):
+    _timer = None
+
     def connectionMade(self):
         logger.info("connection established")
 
@@ -38,44 +133,189 @@ class Confgen(Protocol):
         logger.debug(
             "command received cmd_length=%d, args_count=%d", len(cmd), len(args)
         )
+        if cmd == BUNDLE_COMMAND:
+            d = self.factory.defer_bundle(*args)
+            d.addCallback(self._writeContent)
+            return d
+
         try:
             resource, filename = cmd.split('/')
         except ValueError:
             logger.error("cannot split %s", cmd)
-            return
+            return defer.succeed(None)
+
+        if 'stream' in args:
+            d = self.factory.defer_stream(resource, filename, self.transport, *args)
+        else:
+            d = self.factory.defer_generate(resource, filename, *args)
+        d.addCallback(self._writeContent)
+        return d
 
-        content = self.factory.generate(resource, filename, *args)
+    def _writeContent(self, content):
         if content:
-            self.transport.write(content.encode("utf-8"))
+            data = _encode(content)
+            with timing.measure('write', self._timer) as m:
+                self.transport.write(data)
+                m.bytes = len(data)
 
     def dataReceived(self, data: bytes):
         logger.debug("data received bytes_count=%d", len(data))
 
         data = data.decode("utf-8")
         try:
-            t1 = time.time()
             line = data.replace('\n', '')
+            self._timer = timing.RequestTimer(line)
+            cmd, args = parse_command_line(line)
+            with timing.activate(self._timer):
+                d = self.commandReceived(cmd, args)
+        except Exception:
+            self.transport.loseConnection()
+            raise
 
-            if ' ' in line:
-                cmd, trailing = line.split(' ', 1)
-                args = [arg for arg in trailing.split(' ') if arg]
-            else:
-                cmd, args = line, []
+        def on_served(_):
+            _log_served(self.factory, cmd, line, self._timer)
 
-            self.commandReceived(cmd, args)
+        def on_error(failure):
+            logger.error("error while serving %s: %s", line, failure.getErrorMessage())
 
-            t2 = time.time()
+        d.addCallbacks(on_served, on_error)
+        d.addBoth(lambda _: self.transport.loseConnection())
 
-            logger.info("serving %s in %.3f seconds", line, t2 - t1)
-        finally:
-            self.transport.loseConnection()
+
+class FramedConfgen(LineReceiver):
+    """Pipelined variant of the Confgen protocol.
+
+    Each newline terminated command is answered with a frame made of the
+    content length as a 4 bytes big-endian integer followed by the UTF-8
+    encoded content. An empty frame means that no content was generated.
+    Responses are sent in the order the commands were received and the
+    connection stays open until the client closes it.
+
+    The commands are not read while MAX_PENDING_RESPONSES responses are not
+    written yet, or while the client does not read the written ones.
+    """
+
+    delimiter = b'\n'
+
+    def connectionMade(self):
+        logger.info("framed connection established")
+        self._responses = defer.succeed(None)
+        self._pending_responses = 0
+        self._write_paused = False
+        # the transport pauses the protocol when its write buffer is full
+        self.transport.registerProducer(self, True)
+
+    def connectionLost(self, reason: twisted.python.failure.Failure):
+        logger.info("framed connection lost: %s", reason.getErrorMessage())
+        super().connectionLost(reason=reason)
+
+    def lineReceived(self, line: bytes):
+        line = line.decode("utf-8").rstrip('\r')
+        if not line:
+            return
+
+        timer = timing.RequestTimer(line)
+        cmd, args = parse_command_line(line)
+        with timing.activate(timer):
+            d = self.commandReceived(cmd, args)
+        failed = False
+        self._pending_responses += 1
+        self._updateReading()
+
+        def on_error(failure):
+            nonlocal failed
+            failed = True
+            logger.error("error while serving %s: %s", line, failure.getErrorMessage())
+
+        def on_written(_):
+            self._pending_responses -= 1
+            self._updateReading()
+            if not failed:
+                _log_served(self.factory, cmd, line, timer)
+
+        d.addErrback(on_error)
+        self._responses.addCallback(lambda _: d)
+        self._responses.addCallback(self._writeFrame, timer)
+        self._responses.addCallback(on_written)
+
+    def pauseProducing(self):
+        self._write_paused = True
+        self._updateReading()
+
+    def resumeProducing(self):
+        self._write_paused = False
+        self._updateReading()
+
+    def _updateReading(self):
+        pause = self._write_paused or self._pending_responses >= MAX_PENDING_RESPONSES
+        if pause and not self.paused:
+            super().pauseProducing()
+        elif not pause and self.paused:
+            super().resumeProducing()
+
+    def lineLengthExceeded(self, line: bytes):
+        logger.error("command too long (%d bytes), closing connection", len(line))
+        self.transport.loseConnection()
+
+    def commandReceived(self, cmd: str, args: list[str]):
+        logger.debug(
+            "command received cmd_length=%d, args_count=%d", len(cmd), len(args)
+        )
+        if cmd == BUNDLE_COMMAND:
+            return self.factory.defer_bundle(*args)
+
+        try:
+            resource, filename = cmd.split('/')
+        except ValueError:
+            logger.error("cannot split %s", cmd)
+            return defer.succeed(None)
+
+        return self.factory.defer_generate(resource, filename, *args)
+
+    def _writeFrame(self, content, timer=None):
+        data = _encode(content) if content else b''
+        with timing.measure('write', timer) as m:
+            self.transport.writeSequence([FRAME_HEADER.pack(len(data)), data])
+            m.bytes = len(data)
+
+
+class FramedConfgendFactory(ServerFactory):
+    protocol = FramedConfgen
+
+    def __init__(self, confgend_factory):
+        self._confgend_factory = confgend_factory
+
+    def startFactory(self):
+        self._confgend_factory.doStart()
+
+    def stopFactory(self):
+        self._confgend_factory.doStop()
+
+    def defer_generate(self, resource, filename, *args):
+        return self._confgend_factory.defer_generate(resource, filename, *args)
+
+    def defer_bundle(self, *cache_keys):
+        return self._confgend_factory.defer_bundle(*cache_keys)
+
+    def record_timing(self, key, timer):
+        self._confgend_factory.record_timing(key, timer)
+
+
+class _Builds:
+    """The running generation of a file and the one queued after it"""
+
+    running = None
+    pending = None
 
 
 class ConfgendFactory(ServerFactory):
     protocol = Confgen
 
     def __init__(self, cachedir, config):
-        tpl_helper = new_template_helper()
+        bytecode_cache_dir = None
+        if config.get('template_bytecode_cache'):
+            bytecode_cache_dir = os.path.join(cachedir, TEMPLATE_BYTECODE_CACHE_DIR)
+        tpl_helper = new_template_helper(bytecode_cache_dir)
         dependencies = {
             'config': config,
             'tpl_helper': tpl_helper,
@@ -85,7 +325,33 @@ class ConfgendFactory(ServerFactory):
             'phoned': PhonedFrontend(),
             'wazo': WazoFrontend(),
         }
+        self._config = config
         self._cache = cache.FileCache(cachedir)
+        memory_cache_size = config.get('memory_cache_size')
+        if memory_cache_size:
+            self._cache = cache.MemoryCache(self._cache, memory_cache_size)
+        self._swr_max_age = config.get('swr_max_age', 0)
+        self._slow_generation_threshold = config.get('slow_generation_threshold', 0)
+        self._slow_generation_top_queries = config.get(
+            'slow_generation_top_queries', DEFAULT_SLOW_GENERATION_TOP_QUERIES
+        )
+        self._profiler = profiling.Profiler(
+            os.path.join(cachedir, config.get('profile_dir', DEFAULT_PROFILE_DIR)),
+            config.get('profile_tracemalloc_top', 0),
+        )
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._handled_keys = set()
+        self._unhandled_keys = OrderedDict()
+        self._unhandled_keys_lock = threading.Lock()
+        self.timings = timing.TimingAggregates()
+        self.metrics = metrics.ConfgendMetrics()
+        self._threadpool = None
+        worker_pool_size = config.get('worker_pool_size')
+        if worker_pool_size:
+            self._threadpool = ThreadPool(
+                minthreads=0, maxthreads=worker_pool_size, name='confgend-worker'
+            )
         self._handler_factory = MultiHandlerFactory(
             [
                 CachedHandlerFactoryDecorator(
@@ -96,6 +362,172 @@ class ConfgendFactory(ServerFactory):
             ]
         )
 
+    def startFactory(self):
+        if self._threadpool is not None:
+            logger.info("Starting worker pool with %d threads", self._threadpool.max)
+            self._threadpool.start()
+
+    def stopFactory(self):
+        if self._threadpool is not None:
+            self._threadpool.stop()
+
+    def warm_up(self, cache_keys):
+        # loading the plugins is cheap enough to be done in the reactor thread
+        for suffix in self._config['plugins']:
+            resource, filename = suffix.split('.', 1)
+            self._handler_factory.get(resource, filename)
+
+        for cache_key in cache_keys:
+            resource, filename = cache_key.split('/')
+            self._handler_factory.get(resource, filename)
+
+        if self._threadpool is not None:
+            self._threadpool.callInThread(self._warm_up_cache, cache_keys)
+        else:
+            reactor.callInThread(self._warm_up_cache, cache_keys)
+
+    def _warm_up_cache(self, cache_keys):
+        for cache_key in cache_keys:
+            resource, filename = cache_key.split('/')
+            logger.info("Warming up the cache of %s", cache_key)
+            self._generate_and_cache(cache_key, resource, filename)
+
+    def _defer_to_worker(self, f, *args):
+        # without a worker pool, the generation blocks the reactor thread
+        if self._threadpool is None:
+            return defer.maybeDeferred(f, *args)
+        return threads.deferToThreadPool(
+            reactor, self._threadpool, timing.bind(f), *args
+        )
+
+    def record_timing(self, key, timer):
+        if key != BUNDLE_COMMAND:
+            key = self._handled_key(key)
+        self.timings.add(key, timer)
+        if logger.isEnabledFor(logging.DEBUG):
+            rolling = self.timings.get(key)
+            logger.debug(
+                "rolling timing of %s over %d requests: total=%.3f db=%.3f render=%.3f",
+                key,
+                rolling['requests'],
+                rolling['total'],
+                rolling['db']['seconds'],
+                rolling['render']['seconds'],
+            )
+
+    def _handled_key(self, cache_key):
+        # the files without a handler share one key, so that the clients
+        # cannot create timings and metric series without bound
+        if cache_key in self._handled_keys:
+            return cache_key
+        with self._unhandled_keys_lock:
+            if cache_key in self._unhandled_keys:
+                self._unhandled_keys.move_to_end(cache_key)
+                return UNKNOWN_KEY
+
+        try:
+            resource, filename = cache_key.split('/')
+        except ValueError:
+            return UNKNOWN_KEY
+        if not is_null_handler(self._handler_factory.get(resource, filename)):
+            self._handled_keys.add(cache_key)
+            return cache_key
+
+        with self._unhandled_keys_lock:
+            self._unhandled_keys[cache_key] = None
+            if len(self._unhandled_keys) > MAX_UNHANDLED_KEYS:
+                self._unhandled_keys.popitem(last=False)
+        return UNKNOWN_KEY
+
+    def defer_generate(self, resource, filename, *args):
+        return self._defer_to_worker(self.generate, resource, filename, *args)
+
+    def defer_bundle(self, *cache_keys):
+        return self._defer_to_worker(self.bundle, *cache_keys)
+
+    def defer_stream(self, resource, filename, consumer, *args):
+        # streaming blocks its thread while the consumer is paused
+        if self._threadpool is None:
+            return self.defer_generate(resource, filename, *args)
+        return self._defer_to_worker(self.stream, resource, filename, consumer, *args)
+
+    def bundle(self, *cache_keys):
+        logger.info("Generating bundle of %s", cache_keys)
+        parts = []
+        with session_scope(read_only=True) as session:
+            engine = session.get_bind()
+        # all the files of the bundle are generated from the same snapshot, each
+        # in its own transaction so that a failed statement spoils only one file
+        with snapshot.shared(engine):
+            for cache_key in cache_keys:
+                try:
+                    resource, filename = cache_key.split('/')
+                except ValueError:
+                    logger.error("cannot split %s", cache_key)
+                    parts.append((cache_key, None))
+                    continue
+
+                self.metrics.requests.inc(self._handled_key(cache_key), 'bundle')
+                content = self._run_handler_and_cache(cache_key, resource, filename)
+                if not content:
+                    logger.warning(
+                        "bundle part %s is served from the cache, not the snapshot",
+                        cache_key,
+                    )
+                    content = self._get_cached_content(cache_key)
+                parts.append((cache_key, content))
+        return format_bundle(parts)
+
+    def stream(self, resource, filename, consumer, *args):
+        with timing.measure('lookup'):
+            handler = self._handler_factory.get(resource, filename)
+        if (
+            not is_streamable(handler)
+            or not NOT_STREAMED_ARGS.isdisjoint(args)
+            or _get_etag(args)
+        ):
+            return self.generate(resource, filename, *args)
+
+        logger.info(
+            "Streaming conf for resource=%s and filename=%s", resource, filename
+        )
+        cache_key = f'{resource}/{filename}'
+        self.metrics.requests.inc(self._handled_key(cache_key), 'stream')
+        start = time.perf_counter()
+        output = None
+        try:
+            with session_scope(read_only=True), self._cache.open_for_write(
+                cache_key
+            ) as cache_file:
+                output = streaming.StreamingOutput(
+                    consumer, tee=cache_file, call_from_thread=reactor.callFromThread
+                )
+                reactor.callFromThread(consumer.registerProducer, output, True)
+                # the socket writes are done by the reactor while rendering
+                with self.metrics.in_flight.track(), timing.measure('render') as m:
+                    handler(output=output)
+                    output.flush()
+                    m.bytes = output.bytes_written
+                if not output.bytes_written:
+                    raise streaming.NothingStreamed()
+            self._observe_generation(cache_key, start, output.bytes_written)
+        except streaming.NothingStreamed:
+            return self._get_cached_content(cache_key)
+        except streaming.StreamAborted as e:
+            # the client went away or stopped reading: not a handler error
+            logger.info('stream of %s aborted: %s', cache_key, e)
+            reactor.callFromThread(consumer.abortConnection)
+        except Exception:
+            logger.error('unexpected error raised by handler', exc_info=True)
+            self.metrics.handler_errors.inc(self._handled_key(cache_key))
+            if output is None or not output.bytes_written:
+                return self._get_cached_content(cache_key)
+            # a truncated stream must not look like a complete file to the client
+            reactor.callFromThread(consumer.abortConnection)
+        finally:
+            if output is not None:
+                reactor.callFromThread(consumer.unregisterProducer)
+
     def generate(self, resource, filename, *args):
         logger.info(
             "Generating conf for resource=%s and filename=%s with args=%s",
@@ -104,36 +536,195 @@ class ConfgendFactory(ServerFactory):
             args,
         )
         cache_key = f'{resource}/{filename}'
-        if 'invalidate' in args:
-            self._cache.invalidate(cache_key)
+        self.metrics.requests.inc(self._handled_key(cache_key), _get_request_mode(args))
+        etag = _get_etag(args)
+        if etag and 'cached' in args:
+            with timing.measure('cache'):
+                cached_hash = self._cache.get_hash(cache_key)
+            if cached_hash == etag:
+                self.metrics.cache_hits.inc(self._handled_key(cache_key))
+                return NOT_MODIFIED
+
+        content = self._generate(cache_key, resource, filename, args)
+        if etag and content and cache.content_hash(content) == etag:
+            return NOT_MODIFIED
+        return content
+
+    def _generate(self, cache_key, resource, filename, args):
+        if 'profile' in args:
+            return self._profiler.run(
+                cache_key, self._run_handler_and_cache, cache_key, resource, filename
+            ) or self._get_cached_content(cache_key)
+        elif 'invalidate' in args:
+            with timing.measure('cache'):
+                self._cache.invalidate(cache_key)
         elif 'cached' in args:
             return self._get_cached_content(cache_key) or self._generate_and_cache(
                 cache_key, resource, filename
             )
+        elif 'swr' in args:
+            content = self._get_cached_content(cache_key)
+            if not content:
+                return self._generate_and_cache(cache_key, resource, filename)
+            if self._is_stale(cache_key):
+                self._revalidate(cache_key, resource, filename)
+            return content
         else:
             return self._generate_and_cache(
                 cache_key, resource, filename
             ) or self._get_cached_content(cache_key)
 
+    def _is_stale(self, cache_key):
+        mtime = self._cache.get_mtime(cache_key)
+        return mtime is None or time.time() - mtime > self._swr_max_age
+
+    def _revalidate(self, cache_key, resource, filename):
+        with self._in_flight_lock:
+            if cache_key in self._in_flight:
+                return
+
+        logger.info("Revalidating stale cached content of %s", cache_key)
+        if self._threadpool is not None:
+            self._threadpool.callInThread(
+                self._generate_and_cache, cache_key, resource, filename
+            )
+        else:
+            reactor.callInThread(
+                self._generate_and_cache, cache_key, resource, filename
+            )
+
     def _generate_and_cache(self, cache_key, resource, filename):
-        handler = self._handler_factory.get(resource, filename)
+        # a request never gets the result of a generation started before it,
+        # which may not see its changes: the requests arriving during a
+        # generation share the next one, queued until the running one ends
+        previous = None
+        with self._in_flight_lock:
+            builds = self._in_flight.get(cache_key)
+            if builds is None:
+                builds = self._in_flight[cache_key] = _Builds()
+                builds.running = future = Future()
+            elif builds.pending is None:
+                builds.pending = future = Future()
+                previous = builds.running
+            else:
+                queued = builds.pending
+                builds = None
+
+        if builds is None:
+            self._wait_for_generation(cache_key, queued)
+            return queued.result()
+
+        if previous is not None:
+            self._wait_for_generation(cache_key, previous)
+            with self._in_flight_lock:
+                builds.running, builds.pending = future, None
+
+        try:
+            with self._log_if_slow(cache_key):
+                content = self._run_handler_and_cache(cache_key, resource, filename)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(content)
+            return content
+        finally:
+            with self._in_flight_lock:
+                if builds.pending is None:
+                    del self._in_flight[cache_key]
+
+    def _wait_for_generation(self, cache_key, future):
+        logger.debug("waiting for the in-flight generation of %s", cache_key)
+        futures.wait([future])
+
+    @contextlib.contextmanager
+    def _log_if_slow(self, cache_key):
+        if not self._slow_generation_threshold:
+            yield
+            return
+
+        start = time.perf_counter()
+        with querylog.capture() as query_log:
+            yield
+        elapsed = time.perf_counter() - start
+        if elapsed < self._slow_generation_threshold:
+            return
+
+        logger.warning(
+            "slow generation of %s in %.3f seconds: %d queries in %.3f seconds",
+            cache_key,
+            elapsed,
+            query_log.query_count,
+            query_log.query_time,
+        )
+        for statement, count, seconds in query_log.slowest_statements(
+            self._slow_generation_top_queries
+        ):
+            logger.warning(
+                "slow generation of %s: %d x %.3f seconds: %s",
+                cache_key,
+                count,
+                seconds,
+                ' '.join(statement.split()),
+            )
+        for name, calls, rows in query_log.dao_calls():
+            logger.warning(
+                "slow generation of %s: %s returned %d rows in %d calls",
+                cache_key,
+                name,
+                rows,
+                calls,
+            )
+
+    def _run_handler_and_cache(self, cache_key, resource, filename):
         with session_scope(read_only=True):
-            try:
+            return self._run_handler(cache_key, resource, filename)
+
+    def _run_handler(self, cache_key, resource, filename):
+        start = time.perf_counter()
+        with timing.measure('lookup'):
+            handler = self._handler_factory.get(resource, filename)
+        try:
+            with self.metrics.in_flight.track(), timing.measure('render') as m:
                 content = handler()
-                return self._encode_and_cache(cache_key, content)
-            except Exception:
-                logger.error('unexpected error raised by handler', exc_info=True)
+                m.bytes = _content_size(content)
+            content = self._encode_and_cache(cache_key, content)
+        except Exception:
+            logger.error('unexpected error raised by handler', exc_info=True)
+            self.metrics.handler_errors.inc(self._handled_key(cache_key))
+        else:
+            self._observe_generation(cache_key, start, _content_size(content))
+            return content
+
+    def _observe_generation(self, cache_key, start, size):
+        self.metrics.generation_duration.observe(
+            time.perf_counter() - start, self._handled_key(cache_key)
+        )
+        if size:
+            self.metrics.generated_bytes.set(size, self._handled_key(cache_key))
 
     def _get_cached_content(self, cache_key):
         try:
-            return self._cache.get(cache_key)
+            with timing.measure('cache') as m:
+                content = self._cache.get(cache_key)
+                m.bytes = _content_size(content)
         except AttributeError:
             logger.warning("No cached content for %s", cache_key)
+            self.metrics.cache_misses.inc(self._handled_key(cache_key))
+            return
+
+        if content:
+            self.metrics.cache_hits.inc(self._handled_key(cache_key))
+        else:
+            self.metrics.cache_misses.inc(self._handled_key(cache_key))
+        return content
 
     def _encode_and_cache(self, cache_key, content):
         if not content:
             return
 
         encoded_content = content
-        self._cache.put(cache_key, encoded_content)
+        with timing.measure('cache') as m:
+            self._cache.put(cache_key, encoded_content)
+            m.bytes = _content_size(encoded_content)
         return encoded_content
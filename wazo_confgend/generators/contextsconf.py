@@ -0,0 +1,154 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import configparser
+import functools
+import logging
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+from wazo_confgend.helpers.asterisk import asterisk_parser
+
+logger = logging.getLogger(__name__)
+
+_OBJTPL_SLOTS = {
+    '%%CONTEXT%%': 'context',
+    '%%EXTEN%%': 'exten',
+    '%%PRIORITY%%': 'priority',
+    '%%ACTION%%': 'action',
+    '%%TENANT_UUID%%': 'tenant_uuid',
+}
+_OBJTPL_SLOT_RE = re.compile('|'.join(re.escape(slot) for slot in _OBJTPL_SLOTS))
+
+
+class ContextTemplate(NamedTuple):
+    options: tuple[tuple[str, str], ...]
+    objtpl: tuple[str, ...]
+    dialplan: 'DialplanTemplate'
+
+
+class ContextsConf:
+    """Parsed contexts.conf, split in static options and objtpl lines per section"""
+
+    def __init__(self, sections):
+        self._sections = MappingProxyType(sections)
+
+    @classmethod
+    def parse(cls, path):
+        conf = asterisk_parser()
+        try:
+            with open(path) as f:
+                conf.read_file(f)
+        except configparser.DuplicateSectionError:
+            raise ValueError(f"{path} has conflicting section names")
+
+        if not conf.has_section('template'):
+            raise ValueError(f"Template section doesn't exist in {path}")
+
+        sections = {}
+        for section in conf.sections():
+            options, objtpl = [], []
+            for option_name, option_value in conf.items(section):
+                if option_name == 'objtpl':
+                    objtpl.append(option_value)
+                else:
+                    options.append((option_name, option_value))
+            objtpl = tuple(objtpl)
+            sections[section] = ContextTemplate(
+                tuple(options), objtpl, compile_objtpl(objtpl)
+            )
+        return cls(sections)
+
+    def has_section(self, name):
+        return name in self._sections
+
+    def get_section(self, name):
+        try:
+            return self._sections[name]
+        except KeyError:
+            raise configparser.NoSectionError(name)
+
+
+class DialplanTemplate:
+    """objtpl lines compiled to a format string, rendered once per extension"""
+
+    def __init__(self, lines):
+        self._formats = tuple(self._compile_line(line) for line in lines)
+        self._format = ''.join(f'{fmt}\n' for fmt in self._formats) + '\n'
+        self._trailing_slots = tuple(
+            {
+                name
+                for line in lines
+                for slot, name in _OBJTPL_SLOTS.items()
+                if line.rstrip().endswith(slot)
+            }
+        )
+
+    @staticmethod
+    def _compile_line(line):
+        if line.startswith('%%EXTEN%%'):
+            option = f'exten = {line}'
+        else:
+            option = f'same  =     {line}'
+        option = option.rstrip().replace('{', '{{').replace('}', '}}')
+        return _OBJTPL_SLOT_RE.sub(lambda m: f'{{{_OBJTPL_SLOTS[m.group()]}}}', option)
+
+    def render(self, exten):
+        values = {
+            'context': str(exten.get('context', '')),
+            'exten': str(exten.get('exten', '')),
+            'priority': str(exten.get('priority', '')),
+            'action': str(exten.get('action', '')),
+            'tenant_uuid': str(exten.get('tenant_uuid', '')),
+        }
+        if all(values[slot][-1:].strip() for slot in self._trailing_slots):
+            return self._format.format_map(values)
+
+        # a value ending a line could leave trailing whitespace, which
+        # AsteriskFileWriter.write_option would have stripped
+        lines = [fmt.format_map(values).rstrip() for fmt in self._formats]
+        lines.append('\n')
+        return '\n'.join(lines)
+
+
+@functools.lru_cache(maxsize=128)
+def compile_objtpl(lines):
+    return DialplanTemplate(lines)
+
+
+class ContextsConfLoader:
+    """Keeps the parsed file until its mtime or inode changes"""
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self._contexts_conf = None
+
+    def load(self):
+        st = os.stat(self._path)
+        stat_key = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            if stat_key != self._stat_key:
+                logger.debug('parsing %s', self._path)
+                self._contexts_conf = ContextsConf.parse(self._path)
+                self._stat_key = stat_key
+            return self._contexts_conf
+
+
+_loaders = {}
+_loaders_lock = threading.Lock()
+
+
+def load_contexts_conf(path):
+    if path is None:
+        return ContextsConf({})
+
+    with _loaders_lock:
+        loader = _loaders.get(path)
+        if loader is None:
+            loader = _loaders[path] = ContextsConfLoader(path)
+    return loader.load()
@@ -1,15 +1,15 @@
-# Copyright 2011-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import configparser
 import logging
 
 from xivo import xivo_helpers
 from xivo_dao import asterisk_conf_dao
 from xivo_dao.resources.ivr import dao as ivr_dao
 
+from wazo_confgend import bulk_dao
+from wazo_confgend.generators.contextsconf import load_contexts_conf
 from wazo_confgend.generators.util import AsteriskFileWriter
-from wazo_confgend.helpers.asterisk import asterisk_parser
 
 logger = logging.getLogger(__name__)
 
@@ -107,20 +107,7 @@ class ExtensionsConf:
 
     def generate(self, output):
         ast_writer = AsteriskFileWriter(output)
-        conf = asterisk_parser()
-
-        if self.contextsconf is not None:
-            # load and validate template conf
-            try:
-                with open(self.contextsconf) as contextsconf_file:
-                    conf.read_file(contextsconf_file)
-            except configparser.DuplicateSectionError:
-                raise ValueError(f"{self.contextsconf} has conflicting section names")
-
-            if not conf.has_section('template'):
-                raise ValueError(
-                    f"Template section doesn't exist in {self.contextsconf}"
-                )
+        conf = load_contexts_conf(self.contextsconf)
 
         # hints & features (init)
         self._generate_global_hints(output)
@@ -143,11 +130,14 @@ class ExtensionsConf:
             for extenfeature in extenfeatures
         }
 
+        includes_by_context = bulk_dao.find_contextincludes_settings_by_context()
+        extens_by_context = bulk_dao.find_exten_settings_by_context()
+
         # foreach active context
         for ctx in asterisk_conf_dao.find_context_settings():
             # context name preceded with '!' is ignored
             context_name = ctx['name']
-            if conf and conf.has_section(f'!{context_name}'):
+            if conf.has_section(f'!{context_name}'):
                 continue
             ast_writer.write_newline()
             ast_writer.write_section(context_name)
@@ -158,45 +148,37 @@ class ExtensionsConf:
             else:
                 section = 'template'
 
-            tmpl = []
-            for option_name, option_value in conf.items(section):
-                if option_name == 'objtpl':
-                    tmpl.append(option_value)
-                    continue
+            template = conf.get_section(section)
+            for option_name, option_value in template.options:
                 ast_writer.write_option(
                     option_name, option_value.replace('%%CONTEXT%%', context_name)
                 )
 
             # context includes
-            for row in asterisk_conf_dao.find_contextincludes_settings(context_name):
+            for row in includes_by_context.get(context_name, []):
                 ast_writer.write_option('include', row['include'])
             ast_writer.write_newline()
 
             # objects extensions (user, group, ...)
-            for exten_row in asterisk_conf_dao.find_exten_settings(context_name):
+            for exten_row in extens_by_context.get(context_name, []):
                 exten_generator = extension_generators.get(
                     exten_row['type'], GenericExtensionGenerator
                 )
                 exten = exten_generator(exten_row).generate()
-                self.gen_dialplan_from_template(tmpl, exten, ast_writer)
+                self.gen_dialplan_from_template(template.dialplan, exten, ast_writer)
 
             self._generate_hints(ctx['name'], output)
 
         self._generate_extension_features(conf, xfeatures, ast_writer)
         self._generate_ivr(output)
 
-        return output.getvalue()
-
     def _generate_extension_features(self, conf, xfeatures, ast_writer):
         # XiVO features
         context = 'xivo-features'
         cfeatures = []
-        tmpl = []
+        template = conf.get_section(context)
         ast_writer.write_section(context)
-        for option_name, option_value in conf.items(context):
-            if option_name == 'objtpl':
-                tmpl.append(option_value)
-                continue
+        for option_name, option_value in template.options:
             ast_writer.write_option(
                 option_name, option_value.replace('%%CONTEXT%%', context)
             )
@@ -207,7 +189,7 @@ class ExtensionsConf:
             if feature in DEFAULT_EXTENFEATURES:
                 exten['action'] = DEFAULT_EXTENFEATURES[feature]
                 exten['context'] = context
-                self.gen_dialplan_from_template(tmpl, exten, ast_writer)
+                self.gen_dialplan_from_template(template.dialplan, exten, ast_writer)
 
         for x in ('busy', 'rna', 'unc'):
             fwdtype = f"fwd{x}"
@@ -225,23 +207,11 @@ class ExtensionsConf:
             for exten_feature in cfeatures:
                 ast_writer.write_option('exten', exten_feature)
 
-    def gen_dialplan_from_template(self, template, exten, ast_writer):
+    def gen_dialplan_from_template(self, dialplan, exten, ast_writer):
         if 'priority' not in exten:
             exten['priority'] = 1
 
-        for line in template:
-            prefix, padding = (
-                ('exten', '') if line.startswith('%%EXTEN%%') else ('same ', '    ')
-            )
-
-            line = line.replace('%%CONTEXT%%', str(exten.get('context', '')))
-            line = line.replace('%%EXTEN%%', str(exten.get('exten', '')))
-            line = line.replace('%%PRIORITY%%', str(exten.get('priority', '')))
-            line = line.replace('%%ACTION%%', str(exten.get('action', '')))
-            line = line.replace('%%TENANT_UUID%%', str(exten.get('tenant_uuid', '')))
-
-            ast_writer.write_option(prefix, f'{padding}{line}')
-        ast_writer.write_newline()
+        ast_writer.write_raw(dialplan.render(exten))
 
     def _generate_global_hints(self, output):
         output.write('[usersharedlines]\n')
@@ -1,7 +1,7 @@
-# Copyright 2011-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-
+from collections import defaultdict
 from operator import itemgetter
 
 from xivo_dao import asterisk_conf_dao
@@ -88,10 +88,9 @@ class _SccpDeviceConf:
     _TPL_NAME = 'xivo_device_tpl'
 
     def __init__(self, sccpspeeddialdevices):
-        self._sccpspeeddialdevices = sorted(
-            sccpspeeddialdevices,
-            key=itemgetter('fknum'),
-        )
+        self._sccpspeeddials_by_device = defaultdict(list)
+        for item in sorted(sccpspeeddialdevices, key=itemgetter('fknum')):
+            self._sccpspeeddials_by_device[item['device']].append(item)
 
     def generate(self, sccpdevice, general_device_items, output):
         ast_writer = AsteriskFileWriter(output)
@@ -123,11 +122,10 @@ class _SccpDeviceConf:
             ast_writer.write_newline()
 
     def _generate_speeddials(self, device, ast_writer):
-        for item in self._sccpspeeddialdevices:
-            if item['device'] == device:
-                ast_writer.write_option(
-                    'speeddial', f"{item['user_id']:d}-{item['fknum']:d}"
-                )
+        for item in self._sccpspeeddials_by_device.get(device, []):
+            ast_writer.write_option(
+                'speeddial', f"{item['user_id']:d}-{item['fknum']:d}"
+            )
 
 
 class _SccpLineConf:
@@ -0,0 +1,166 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import configparser
+import os
+import tempfile
+import textwrap
+import unittest
+
+from hamcrest import assert_that, calling, equal_to, raises, same_instance
+
+from ..contextsconf import (
+    ContextsConf,
+    ContextsConfLoader,
+    ContextTemplate,
+    DialplanTemplate,
+    compile_objtpl,
+    load_contexts_conf,
+)
+
+
+class TestContextsConf(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'contexts.conf')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, content, mtime=None):
+        with open(self.path, 'w') as f:
+            f.write(textwrap.dedent(content))
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_parse(self):
+        self._write(
+            '''\
+            [template]
+            exten = i,1,Playback(no-user-find)
+            same  =   n,Hangup()
+
+            objtpl = %%EXTEN%%,%%PRIORITY%%,Playback(no-user-find)
+            objtpl =                      n,Hangup()
+
+            [!ignored]
+            '''
+        )
+
+        conf = ContextsConf.parse(self.path)
+
+        objtpl = ('%%EXTEN%%,%%PRIORITY%%,Playback(no-user-find)', 'n,Hangup()')
+        assert_that(
+            conf.get_section('template'),
+            equal_to(
+                ContextTemplate(
+                    options=(
+                        ('exten', 'i,1,Playback(no-user-find)'),
+                        ('same', 'n,Hangup()'),
+                    ),
+                    objtpl=objtpl,
+                    dialplan=compile_objtpl(objtpl),
+                )
+            ),
+        )
+        assert_that(conf.has_section('!ignored'), equal_to(True))
+        assert_that(
+            calling(conf.get_section).with_args('unknown'),
+            raises(configparser.NoSectionError),
+        )
+
+    def test_parse_without_template_section(self):
+        self._write('[foo]\n')
+
+        assert_that(
+            calling(ContextsConf.parse).with_args(self.path),
+            raises(ValueError, 'Template section'),
+        )
+
+    def test_loader_reuses_parsed_file(self):
+        self._write('[template]\nobjtpl = a\n', mtime=1000)
+        loader = ContextsConfLoader(self.path)
+
+        first = loader.load()
+
+        assert_that(loader.load(), same_instance(first))
+
+    def test_loader_reloads_when_mtime_changes(self):
+        self._write('[template]\nobjtpl = a\n', mtime=1000)
+        loader = ContextsConfLoader(self.path)
+        loader.load()
+
+        self._write('[template]\nobjtpl = b\n', mtime=2000)
+
+        assert_that(loader.load().get_section('template').objtpl, equal_to(('b',)))
+
+    def test_loader_reloads_when_file_is_replaced(self):
+        self._write('[template]\nobjtpl = a\n', mtime=1000)
+        loader = ContextsConfLoader(self.path)
+        loader.load()
+
+        new_path = f'{self.path}.new'
+        with open(new_path, 'w') as f:
+            f.write('[template]\nobjtpl = b\n')
+        os.utime(new_path, (1000, 1000))
+        os.replace(new_path, self.path)
+
+        assert_that(loader.load().get_section('template').objtpl, equal_to(('b',)))
+
+    def test_load_contexts_conf_without_path(self):
+        conf = load_contexts_conf(None)
+
+        assert_that(conf.has_section('template'), equal_to(False))
+
+
+class TestDialplanTemplate(unittest.TestCase):
+    def test_render(self):
+        template = DialplanTemplate(
+            (
+                '%%EXTEN%%,%%PRIORITY%%,Set(__WAZO_BASE_CONTEXT=${CONTEXT})',
+                'n,Set(__WAZO_TENANT_UUID=%%TENANT_UUID%%)',
+                'n,Goto(%%CONTEXT%%,${EXTEN},1)',
+                'n,%%ACTION%%',
+            )
+        )
+        exten = {
+            'context': 'ctx',
+            'exten': '1001',
+            'priority': 1,
+            'action': 'GoSub(user,s,1(42,,12))',
+            'tenant_uuid': 'tenant-uuid',
+        }
+
+        assert_that(
+            template.render(exten),
+            equal_to(
+                'exten = 1001,1,Set(__WAZO_BASE_CONTEXT=${CONTEXT})\n'
+                'same  =     n,Set(__WAZO_TENANT_UUID=tenant-uuid)\n'
+                'same  =     n,Goto(ctx,${EXTEN},1)\n'
+                'same  =     n,GoSub(user,s,1(42,,12))\n'
+                '\n'
+            ),
+        )
+
+    def test_render_missing_values(self):
+        template = DialplanTemplate(('%%EXTEN%%,1,NoOp(%%CONTEXT%%)', 'n,%%ACTION%%'))
+
+        assert_that(
+            template.render({'exten': '*98'}),
+            equal_to('exten = *98,1,NoOp()\nsame  =     n,\n\n'),
+        )
+
+    def test_render_no_lines(self):
+        assert_that(DialplanTemplate(()).render({}), equal_to('\n'))
+
+    def test_render_strips_trailing_whitespace(self):
+        template = DialplanTemplate(('%%EXTEN%%,1,%%ACTION%%', 'n, %%ACTION%%'))
+
+        assert_that(
+            template.render({'exten': '*98', 'action': 'Hangup() '}),
+            equal_to('exten = *98,1,Hangup()\nsame  =     n, Hangup()\n\n'),
+        )
+        assert_that(
+            template.render({'exten': '*98'}),
+            equal_to('exten = *98,1,\nsame  =     n,\n\n'),
+        )
@@ -1,4 +1,4 @@
-# Copyright 2011-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
@@ -12,6 +12,7 @@ from hamcrest import assert_that, contains_string
 from jinja2.loaders import DictLoader
 from xivo_dao.alchemy.ivr import IVR
 
+from wazo_confgend.generators.contextsconf import ContextTemplate, DialplanTemplate
 from wazo_confgend.generators.extensionsconf import ExtensionsConf
 from wazo_confgend.generators.util import AsteriskFileWriter
 from wazo_confgend.hints.generator import HintGenerator
@@ -35,12 +36,15 @@ class TestExtensionsConf(unittest.TestCase):
     @patch('xivo_dao.asterisk_conf_dao.find_exten_xivofeatures_setting')
     def test_extensions_features(self, mock_find_exten_xivofeatures_setting):
         mock_conf = Mock()
-        mock_conf.items.return_value = [
-            ('objtpl', '%%EXTEN%%,%%PRIORITY%%,Set(__WAZO_BASE_CONTEXT=${CONTEXT})'),
-            ('objtpl', 'n,Set(__XIVO_BASE_EXTEN=${EXTEN})'),
-            ('objtpl', 'n,GoSub(contextlib,entry-exten-context,1)'),
-            ('objtpl', 'n,%%ACTION%%'),
-        ]
+        objtpl = (
+            '%%EXTEN%%,%%PRIORITY%%,Set(__WAZO_BASE_CONTEXT=${CONTEXT})',
+            'n,Set(__XIVO_BASE_EXTEN=${EXTEN})',
+            'n,GoSub(contextlib,entry-exten-context,1)',
+            'n,%%ACTION%%',
+        )
+        mock_conf.get_section.return_value = ContextTemplate(
+            options=(), objtpl=objtpl, dialplan=DialplanTemplate(objtpl)
+        )
         xfeatures = {
             'fwdrna': {'exten': '_*22.', 'enabled': True},
             'fwdbusy': {'exten': '_*23.', 'enabled': True},
@@ -74,7 +78,7 @@ class TestExtensionsConf(unittest.TestCase):
         self.extensionsconf._generate_extension_features(
             mock_conf, xfeatures, ast_writer
         )
-        mock_conf.items.assert_called_once_with('xivo-features')
+        mock_conf.get_section.assert_called_once_with('xivo-features')
         mock_find_exten_xivofeatures_setting.assert_called_once()
         self.assertEqual(
             self.output.getvalue(),
@@ -110,11 +114,13 @@ class TestExtensionsConf(unittest.TestCase):
         )
 
     def test_generate_dialplan_from_template(self):
-        template = ["%%EXTEN%%,%%PRIORITY%%,Set('__WAZO_BASE_CONTEXT': ${CONTEXT})"]
+        dialplan = DialplanTemplate(
+            ["%%EXTEN%%,%%PRIORITY%%,Set('__WAZO_BASE_CONTEXT': ${CONTEXT})"]
+        )
         exten = {'exten': '*98', 'priority': 1}
 
         ast_writer = AsteriskFileWriter(self.output)
-        self.extensionsconf.gen_dialplan_from_template(template, exten, ast_writer)
+        self.extensionsconf.gen_dialplan_from_template(dialplan, exten, ast_writer)
 
         self.assertEqual(
             self.output.getvalue(),
@@ -156,8 +162,9 @@ class TestExtensionsConf(unittest.TestCase):
         )
 
     @patch('wazo_confgend.generators.extensionsconf.ivr_dao')
+    @patch('wazo_confgend.generators.extensionsconf.bulk_dao')
     @patch('wazo_confgend.generators.extensionsconf.asterisk_conf_dao')
-    def test_generate(self, mock_asterisk_conf_dao, mock_ivr_dao):
+    def test_generate(self, mock_asterisk_conf_dao, mock_bulk_dao, mock_ivr_dao):
         hints = [
             'exten = 1000,hint,SIP/abcdef',
             'exten = 4000,hint,confbridge:1',
@@ -186,11 +193,12 @@ class TestExtensionsConf(unittest.TestCase):
                 "tenant_uuid": "tenant-uuid",
             },
         ]
-        mock_asterisk_conf_dao.find_contextincludes_settings.return_value = [
-            {"include": "include-me.conf"}
-        ]
-        mock_asterisk_conf_dao.find_exten_settings.side_effect = [
-            [
+        mock_bulk_dao.find_contextincludes_settings_by_context.return_value = {
+            "ctx_name": [{"include": "include-me.conf"}],
+            "ctx_internal": [{"include": "include-me.conf"}],
+        }
+        mock_bulk_dao.find_exten_settings_by_context.return_value = {
+            "ctx_name": [
                 {
                     "type": "incall",
                     "context": "default",
@@ -200,7 +208,7 @@ class TestExtensionsConf(unittest.TestCase):
                     "tenant_uuid": "2b853b5b-6c19-4123-90da-3ce05fe9aa74",
                 }
             ],
-            [
+            "ctx_internal": [
                 {
                     "type": "user",
                     "context": "ctx_internal",
@@ -210,7 +218,7 @@ class TestExtensionsConf(unittest.TestCase):
                     "tenant_uuid": "5adadf7b-5a4c-4701-9486-a4e8f9d21db0",
                 }
             ],
-        ]
+        }
 
         self.extensionsconf.generate(self.output)
 
@@ -219,3 +227,5 @@ class TestExtensionsConf(unittest.TestCase):
         with open(os.path.join(path, "expected_generated_extension.conf")) as f:
             expected_lines = [line for line in f.read().split("\n") if line]
         self.assertEqual(expected_lines, lines)
+        mock_asterisk_conf_dao.find_contextincludes_settings.assert_not_called()
+        mock_asterisk_conf_dao.find_exten_settings.assert_not_called()
@@ -1,10 +1,13 @@
-# Copyright 2012-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2012-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
+import io
 import unittest
 from unittest.mock import Mock, patch
 
+from hamcrest import assert_that, equal_to
+
 from wazo_confgend.generators.queues import QueuesConf
 from wazo_confgend.generators.tests.util import assert_generates_config
 
@@ -18,7 +21,8 @@ class TestQueuesConf(unittest.TestCase):
         'xivo_dao.asterisk_conf_dao.find_queue_general_settings', Mock(return_value=[])
     )
     @patch(
-        'xivo_dao.asterisk_conf_dao.find_queue_members_settings', Mock(return_value=[])
+        'wazo_confgend.bulk_dao.find_queue_members_settings_by_queue',
+        Mock(return_value={}),
     )
     def test_empty_sections(self):
         assert_generates_config(
@@ -29,7 +33,8 @@ class TestQueuesConf(unittest.TestCase):
         )
 
     @patch(
-        'xivo_dao.asterisk_conf_dao.find_queue_members_settings', Mock(return_value=[])
+        'wazo_confgend.bulk_dao.find_queue_members_settings_by_queue',
+        Mock(return_value={}),
     )
     @patch('xivo_dao.asterisk_conf_dao.find_queue_settings', Mock(return_value=[]))
     @patch('xivo_dao.asterisk_conf_dao.find_queue_general_settings')
@@ -51,7 +56,7 @@ class TestQueuesConf(unittest.TestCase):
         'xivo_dao.asterisk_conf_dao.find_queue_general_settings', Mock(return_value=[])
     )
     @patch('xivo_dao.asterisk_conf_dao.find_queue_settings')
-    @patch('xivo_dao.asterisk_conf_dao.find_queue_members_settings')
+    @patch('wazo_confgend.bulk_dao.find_queue_members_settings_by_queue')
     def test_queues_section(self, find_queue_members_settings, find_queue_settings):
         find_queue_settings.return_value = [
             {
@@ -62,10 +67,13 @@ class TestQueuesConf(unittest.TestCase):
                 'leaveempty': '',
             }
         ]
-        find_queue_members_settings.return_value = [
-            ('PJSIP/abc', '1', '', ''),
-            ('iface', '2', 'name', 'state_iface'),
-        ]
+        find_queue_members_settings.return_value = {
+            'grp-supertenant-42f6b00e-0181-427b-b885-cf0b95893762': [
+                ('PJSIP/abc', '1', '', ''),
+                ('iface', '2', 'name', 'state_iface'),
+            ],
+            'grp-other': [('PJSIP/def', '0', '', '')],
+        }
 
         assert_generates_config(
             self.queues_conf,
@@ -80,6 +88,30 @@ class TestQueuesConf(unittest.TestCase):
         ''',
         )
         find_queue_settings.assert_called_once_with()
-        find_queue_members_settings.assert_called_once_with(
-            'grp-supertenant-42f6b00e-0181-427b-b885-cf0b95893762'
-        )
+        find_queue_members_settings.assert_called_once_with()
+
+    @patch(
+        'xivo_dao.asterisk_conf_dao.find_queue_general_settings', Mock(return_value=[])
+    )
+    @patch('xivo_dao.asterisk_conf_dao.find_queue_members_settings')
+    @patch('xivo_dao.asterisk_conf_dao.find_queue_settings')
+    @patch('wazo_confgend.bulk_dao.find_queue_members_settings_by_queue')
+    def test_query_count_does_not_depend_on_queue_count(
+        self, find_members_by_queue, find_queue_settings, find_queue_members_settings
+    ):
+        for queue_count in (10, 1000):
+            find_members_by_queue.reset_mock()
+            names = [f'queue-{i}' for i in range(queue_count)]
+            find_queue_settings.return_value = [
+                {'name': name, 'label': name} for name in names
+            ]
+            find_members_by_queue.return_value = {
+                name: [(f'PJSIP/{name}', '0', '', '')] for name in names
+            }
+
+            output = io.StringIO()
+            self.queues_conf.generate(output)
+
+            assert_that(output.getvalue().count('member = '), equal_to(queue_count))
+            assert_that(find_members_by_queue.call_count, equal_to(1))
+        find_queue_members_settings.assert_not_called()
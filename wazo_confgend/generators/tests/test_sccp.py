@@ -1,4 +1,4 @@
-# Copyright 2011-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
@@ -278,6 +278,41 @@ class TestSccpDeviceConf(unittest.TestCase):
         ''',
         )
 
+    def test_speeddials_are_indexed_by_device(self):
+        accesses = []
+
+        class CountingDict(dict):
+            def __getitem__(self, key):
+                accesses.append(key)
+                return super().__getitem__(key)
+
+        device_count, speeddials_per_device = 200, 5
+        sccpdevice = [
+            {
+                'name': f'SEP{i:012d}',
+                'device': f'SEP{i:012d}',
+                'line': '',
+                'voicemail': '',
+            }
+            for i in range(device_count)
+        ]
+        sccpspeeddials = [
+            CountingDict(
+                fknum=fknum, user_id=i, device=f'SEP{i:012d}', exten='', label=''
+            )
+            for i in range(device_count)
+            for fknum in range(speeddials_per_device, 0, -1)
+        ]
+
+        device_conf = _SccpDeviceConf(sccpspeeddials)
+        device_conf._generate_devices(sccpdevice, self._ast_writer)
+
+        config = self._output.getvalue()
+        self.assertEqual(config.count('speeddial = '), len(sccpspeeddials))
+        self.assertIn('speeddial = 0-1\nspeeddial = 0-2\n', config)
+        # a few lookups per speed dial, whatever the number of devices
+        self.assertLessEqual(len(accesses), 5 * len(sccpspeeddials))
+
 
 class TestSccpLineConf(unittest.TestCase):
     def setUp(self):
@@ -1,13 +1,14 @@
-# Copyright 2012-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2012-2026 The Wazo Authors  (see the AUTHORS file)
 # Copyright (C) 2016 Proformatique Inc.
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
+import io
 import textwrap
 import unittest
 from unittest.mock import Mock, patch
 
-from hamcrest import assert_that, equal_to
+from hamcrest import assert_that, equal_to, none
 from xivo_dao.alchemy.voicemail import Voicemail
 
 from wazo_confgend.generators.tests.util import assert_generates_config
@@ -159,6 +160,24 @@ class TestVoicemailGenerator(unittest.TestCase):
         output = generator.generate()
         assert_that(output, equal_to(expected))
 
+    def test_given_output_when_generating_then_writes_to_output(self):
+        generator = VoicemailGenerator(
+            [
+                Voicemail(
+                    name='myvoicemail', number='1000', context='default', options=[]
+                ),
+            ]
+        )
+        output = io.StringIO()
+
+        result = generator.generate(output)
+
+        assert_that(result, none())
+        assert_that(
+            output.getvalue(),
+            equal_to('[default]\n1000 => ,myvoicemail,,,deletevoicemail=no\n\n'),
+        )
+
 
 class TestVoicemailConf(unittest.TestCase):
     @patch(
@@ -167,7 +186,7 @@ class TestVoicemailConf(unittest.TestCase):
     )
     def setUp(self):
         self.voicemail_generator = Mock(VoicemailGenerator)
-        self.voicemail_generator.generate.return_value = ''
+        self.voicemail_generator.generate.return_value = None
 
         self.voicemail_conf = VoicemailConf(self.voicemail_generator)
         self.voicemail_conf._voicemail_settings = []
@@ -188,7 +207,9 @@ class TestVoicemailConf(unittest.TestCase):
     )
     def test_non_ascii_voicemail(self):
         voicemail_generator = Mock(VoicemailGenerator)
-        voicemail_generator.generate.return_value = '[defaulté]'
+        voicemail_generator.generate.side_effect = lambda output: output.write(
+            '[defaulté]'
+        )
         voicemail_conf = VoicemailConf(voicemail_generator)
         voicemail_conf._voicemail_settings = []
 
@@ -249,12 +270,14 @@ class TestVoicemailConf(unittest.TestCase):
         )
 
     def test_voicemail_generation_included_in_config(self):
-        self.voicemail_generator.generate.return_value = textwrap.dedent(
-            """\
-            [default]
-            1000 => ,myvoicemail,,,
-
-            """
+        self.voicemail_generator.generate.side_effect = lambda output: output.write(
+            textwrap.dedent(
+                """\
+                [default]
+                1000 => ,myvoicemail,,,
+
+                """
+            )
         )
 
         assert_generates_config(
@@ -1,4 +1,4 @@
-# Copyright 2011-2022 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
@@ -71,5 +71,8 @@ class AsteriskFileWriter:
     def write_newline(self):
         self._fobj.write('\n')
 
+    def write_raw(self, text):
+        self._fobj.write(text)
+
     def _write_line(self, line):
         self._fobj.write(f'{line}\n')
@@ -1,8 +1,9 @@
-# Copyright 2011-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
 import itertools
+from io import StringIO
 
 from xivo_dao import asterisk_conf_dao
 from xivo_dao.resources.voicemail import dao as voicemail_dao
@@ -18,14 +19,20 @@ class VoicemailGenerator:
     def __init__(self, voicemails):
         self._voicemails = voicemails
 
-    def generate(self):
-        output = ''
+    def generate(self, output=None):
+        if output is None:
+            output = StringIO()
+            self._generate(output)
+            return output.getvalue()
+
+        self._generate(output)
+
+    def _generate(self, output):
         for context, voicemails in self.group_voicemails():
-            output += self.format_context(context)
-            output += '\n'
-            output += self.format_voicemails(voicemails)
-            output += '\n\n'
-        return output
+            output.write(f'{self.format_context(context)}\n')
+            for voicemail in voicemails:
+                output.write(f'{self.format_voicemail(voicemail)}\n')
+            output.write('\n')
 
     def group_voicemails(self):
         return itertools.groupby(self._voicemails, lambda v: v.context)
@@ -33,9 +40,6 @@ class VoicemailGenerator:
     def format_context(self, context):
         return f'[{context}]'
 
-    def format_voicemails(self, voicemails):
-        return '\n'.join(self.format_voicemail(v) for v in voicemails)
-
     def format_voicemail(self, voicemail):
         parts = (
             voicemail.password or '',
@@ -95,7 +99,9 @@ class VoicemailConf:
         self._gen_general_section(ast_writer)
         ast_writer.write_newline()
         self._gen_zonemessages_section(ast_writer)
-        output.write(f'\n{self.voicemail_generator.generate()}\n')
+        output.write('\n')
+        self.voicemail_generator.generate(output)
+        output.write('\n')
 
     def _gen_general_section(self, ast_writer):
         ast_writer.write_section('general')
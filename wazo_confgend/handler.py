@@ -1,4 +1,4 @@
-# Copyright 2016-2022 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
@@ -13,6 +13,22 @@ class NoSuchHandler(Exception):
     pass
 
 
+def streamable(func):
+    # marks a handler able to write its content to an `output` file-like object
+    func.streamable = True
+    return func
+
+
+def is_streamable(handler):
+    return getattr(handler, 'streamable', False)
+
+
+def is_null_handler(handler):
+    return isinstance(
+        getattr(handler, '__self__', None), NullHandlerFactory._NullHandler
+    )
+
+
 class HandlerFactory:
     pass
 
@@ -1,9 +1,10 @@
-# Copyright 2014-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2014-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from xivo_dao.resources.func_key import hint_dao
 
 from wazo_confgend.hints import adaptor as hint_adaptor
+from wazo_confgend.hints.loader import HintLoader
 
 
 class HintGenerator:
@@ -11,18 +12,21 @@ class HintGenerator:
 
     @classmethod
     def build(cls):
+        loader = HintLoader(hint_dao)
+        loader.load_all()
+
         context_resource_adaptors = [
-            hint_adaptor.UserAdaptor(hint_dao),
-            hint_adaptor.ConferenceAdaptor(hint_dao),
-            hint_adaptor.ServiceAdaptor(hint_dao),
-            hint_adaptor.ForwardAdaptor(hint_dao),
-            hint_adaptor.GroupMemberAdaptor(hint_dao),
-            hint_adaptor.AgentAdaptor(hint_dao),
-            hint_adaptor.BSFilterAdaptor(hint_dao),
-            hint_adaptor.CustomAdaptor(hint_dao),
+            hint_adaptor.UserAdaptor(loader),
+            hint_adaptor.ConferenceAdaptor(loader),
+            hint_adaptor.ServiceAdaptor(loader),
+            hint_adaptor.ForwardAdaptor(loader),
+            hint_adaptor.GroupMemberAdaptor(loader),
+            hint_adaptor.AgentAdaptor(loader),
+            hint_adaptor.BSFilterAdaptor(loader),
+            hint_adaptor.CustomAdaptor(loader),
         ]
         global_resource_adaptors = [
-            hint_adaptor.UserSharedHintAdaptor(hint_dao),
+            hint_adaptor.UserSharedHintAdaptor(loader),
         ]
 
         return cls(
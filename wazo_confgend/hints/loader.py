@@ -0,0 +1,70 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+
+
+class HintLoader:
+    """hint_dao front end running each query at most once per build
+
+    The adaptors look up hints by context in the dicts returned by the
+    *_hints() functions, so once every family is loaded, generating the hints
+    of a context does not touch the database.
+    """
+
+    FAMILIES = (
+        'user_hints',
+        'conference_hints',
+        'service_hints',
+        'forward_hints',
+        'groupmember_hints',
+        'agent_hints',
+        'bsfilter_hints',
+        'custom_hints',
+    )
+
+    def __init__(self, dao):
+        self._dao = dao
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def load_all(self):
+        for name in self.FAMILIES:
+            self._load(name)
+        self._load('progfunckey_extension')
+
+    def progfunckey_extension(self):
+        return self._load('progfunckey_extension')
+
+    def user_hints(self):
+        return self._load('user_hints')
+
+    def user_shared_hints(self):
+        return self._load('user_shared_hints')
+
+    def conference_hints(self):
+        return self._load('conference_hints')
+
+    def service_hints(self):
+        return self._load('service_hints')
+
+    def forward_hints(self):
+        return self._load('forward_hints')
+
+    def groupmember_hints(self):
+        return self._load('groupmember_hints')
+
+    def agent_hints(self):
+        return self._load('agent_hints')
+
+    def bsfilter_hints(self):
+        return self._load('bsfilter_hints')
+
+    def custom_hints(self):
+        return self._load('custom_hints')
+
+    def _load(self, name):
+        with self._lock:
+            if name not in self._results:
+                self._results[name] = getattr(self._dao, name)()
+            return self._results[name]
@@ -0,0 +1,53 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest.mock import Mock
+
+from hamcrest import assert_that, contains_exactly, equal_to
+
+from ..adaptor import ForwardAdaptor, ServiceAdaptor
+from ..loader import HintLoader
+
+CONTEXT = 'context'
+
+
+class TestHintLoader(unittest.TestCase):
+    def setUp(self):
+        self.dao = Mock()
+        self.loader = HintLoader(self.dao)
+
+    def test_load_all(self):
+        self.loader.load_all()
+        self.loader.load_all()
+
+        for name in HintLoader.FAMILIES + ('progfunckey_extension',):
+            getattr(self.dao, name).assert_called_once_with()
+        self.dao.user_shared_hints.assert_not_called()
+
+    def test_results_are_memoized(self):
+        self.dao.user_hints.return_value = {CONTEXT: []}
+
+        assert_that(self.loader.user_hints(), equal_to({CONTEXT: []}))
+        assert_that(self.loader.user_hints(), equal_to({CONTEXT: []}))
+
+        self.dao.user_hints.assert_called_once_with()
+
+    def test_progfunckey_extension_is_fetched_once_for_all_contexts(self):
+        self.dao.progfunckey_extension.return_value = '*735'
+        self.dao.forward_hints.return_value = {
+            f'context-{i}': [Mock(user_id=42, extension='*23', argument=None)]
+            for i in range(100)
+        }
+        self.dao.service_hints.return_value = {}
+        adaptors = [ForwardAdaptor(self.loader), ServiceAdaptor(self.loader)]
+
+        for i in range(100):
+            for adaptor in adaptors:
+                list(adaptor.generate(f'context-{i}'))
+
+        assert_that(
+            list(adaptors[0].generate('context-1')),
+            contains_exactly(('*73542***223', 'Custom:*73542***223')),
+        )
+        self.dao.progfunckey_extension.assert_called_once_with()
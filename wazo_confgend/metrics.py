@@ -0,0 +1,215 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Metrics of the daemon, exposed in the Prometheus text format"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import threading
+
+from twisted.web import resource, server
+
+CONTENT_TYPE = b'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = [*zip(labelnames, labelvalues), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _check_labels(self, labelvalues):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}')
+
+    def collect(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.type}'
+        with self._lock:
+            values = sorted(self._values.items())
+        for labelvalues, value in values:
+            yield from self._samples(labelvalues, value)
+
+    def _samples(self, labelvalues, value):
+        labels = _format_labels(self.labelnames, labelvalues)
+        yield f'{self.name}{labels} {_format_value(value)}'
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        self._check_labels(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value, *labelvalues):
+        self._check_labels(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def inc(self, *labelvalues, amount=1):
+        self._check_labels(labelvalues)
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+    @contextlib.contextmanager
+    def track(self, *labelvalues):
+        """Count the blocks currently running"""
+        self.inc(*labelvalues)
+        try:
+            yield
+        finally:
+            self.dec(*labelvalues)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self._buckets = (*sorted(buckets), float('inf'))
+
+    def observe(self, value, *labelvalues):
+        self._check_labels(labelvalues)
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            counts, total = self._values.get(
+                labelvalues, ([0] * len(self._buckets), 0.0)
+            )
+            counts[index] += 1
+            self._values[labelvalues] = (counts, total + value)
+
+    def _samples(self, labelvalues, value):
+        counts, total = value
+        cumulative = 0
+        for bound, count in zip(self._buckets, counts):
+            cumulative += count
+            labels = _format_labels(
+                self.labelnames, labelvalues, [('le', _format_value(bound))]
+            )
+            yield f'{self.name}_bucket{labels} {cumulative}'
+        labels = _format_labels(self.labelnames, labelvalues)
+        yield f'{self.name}_sum{labels} {_format_value(total)}'
+        yield f'{self.name}_count{labels} {cumulative}'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def exposition(self):
+        lines = [line for metric in self._metrics for line in metric.collect()]
+        return '\n'.join(lines) + '\n'
+
+
+class ConfgendMetrics:
+    def __init__(self):
+        self.registry = Registry()
+        self.requests = self.registry.register(
+            Counter(
+                'wazo_confgend_requests_total',
+                'Requests by file and mode.',
+                ('file', 'mode'),
+            )
+        )
+        self.generation_duration = self.registry.register(
+            Histogram(
+                'wazo_confgend_generation_duration_seconds',
+                'Time spent generating a file.',
+                ('file',),
+            )
+        )
+        self.generated_bytes = self.registry.register(
+            Gauge(
+                'wazo_confgend_generated_bytes',
+                'Size of the last generated content of a file.',
+                ('file',),
+            )
+        )
+        self.cache_hits = self.registry.register(
+            Counter(
+                'wazo_confgend_cache_hits_total',
+                'Files served from the cache.',
+                ('file',),
+            )
+        )
+        self.cache_misses = self.registry.register(
+            Counter(
+                'wazo_confgend_cache_misses_total',
+                'Files looked up in the cache without being found.',
+                ('file',),
+            )
+        )
+        self.handler_errors = self.registry.register(
+            Counter(
+                'wazo_confgend_handler_errors_total',
+                'Unexpected errors raised by the handlers.',
+                ('file',),
+            )
+        )
+        self.in_flight = self.registry.register(
+            Gauge(
+                'wazo_confgend_generations_in_flight',
+                'Generations currently running.',
+            )
+        )
+        self.in_flight.set(0)
+
+
+class MetricsResource(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, registry):
+        super().__init__()
+        self._registry = registry
+
+    def render_GET(self, request):
+        request.setHeader(b'content-type', CONTENT_TYPE)
+        return self._registry.exposition().encode('utf-8')
+
+
+class MetricsSite(server.Site):
+    # scraping is frequent, the requests are not worth logging
+    noisy = False
+
+    def __init__(self, registry):
+        super().__init__(MetricsResource(registry))
+
+    def log(self, request):
+        pass
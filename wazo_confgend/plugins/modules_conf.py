@@ -1,8 +1,9 @@
-# Copyright 2019-2025 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
 import logging
+import os
 
 from jinja2 import Template
 
@@ -19,15 +20,24 @@ class ModulesConfGenerator:
         )
 
         self.template_filename = config['templates']['modulesconf']
+        self._template = None
+        self._template_stat = None
 
     def generate(self):
         try:
-            with open(self.template_filename) as f:
-                raw = f.read()
-                template = Template(raw)
+            template = self._get_template()
         except OSError as e:
             logger.error('%s', e)
             content = None
         else:
             content = template.render(modules=self._disabled_asterisk_modules)
         return content
+
+    def _get_template(self):
+        st = os.stat(self.template_filename)
+        template_stat = (st.st_ino, st.st_mtime_ns)
+        if template_stat != self._template_stat:
+            with open(self.template_filename) as f:
+                self._template = Template(f.read())
+            self._template_stat = template_stat
+        return self._template
@@ -1,4 +1,4 @@
-# Copyright 2018-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2018-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
@@ -9,6 +9,7 @@ from xivo_dao.resources.asterisk_file import dao as asterisk_file_dao
 from xivo_dao.resources.pjsip_transport import dao as transport_dao
 
 from wazo_confgend.generators.util import AsteriskFileWriter
+from wazo_confgend.handler import streamable
 
 from ..helpers.asterisk import AsteriskFileGenerator
 
@@ -17,9 +18,18 @@ class PJSIPConfGenerator:
     def __init__(self, dependencies):
         pass
 
-    def generate(self):
-        asterisk_file_generator = AsteriskFileGenerator(asterisk_file_dao)
+    @streamable
+    def generate(self, output=None):
+        if output is not None:
+            self._generate(output)
+            return
+
         output = StringIO()
+        self._generate(output)
+        return output.getvalue()
+
+    def _generate(self, output):
+        asterisk_file_generator = AsteriskFileGenerator(asterisk_file_dao)
         asterisk_file_generator.generate(
             'pjsip.conf', output, required_sections=['global', 'system']
         )
@@ -30,7 +40,6 @@ class PJSIPConfGenerator:
         self.generate_trunks(output)
         output.write('\n')
         self.generate_meeting_guests(output)
-        return output.getvalue()
 
     def generate_transports(self, output):
         writer = AsteriskFileWriter(output)
@@ -43,13 +52,13 @@ class PJSIPConfGenerator:
     def generate_lines(self, output):
         writer = AsteriskFileWriter(output)
         endpoints = asterisk_conf_dao.find_sip_user_settings()
-        for endpoint in endpoints:
+        for endpoint in _consume(endpoints):
             self._write_simple_endpoint(writer, endpoint)
 
     def generate_meeting_guests(self, output):
         writer = AsteriskFileWriter(output)
         endpoints = asterisk_conf_dao.find_sip_meeting_guests_settings()
-        for endpoint in endpoints:
+        for endpoint in _consume(endpoints):
             self._write_simple_endpoint(writer, endpoint)
 
     def _write_simple_endpoint(self, writer, endpoint):
@@ -72,7 +81,7 @@ class PJSIPConfGenerator:
     def generate_trunks(self, output):
         writer = AsteriskFileWriter(output)
         endpoints = asterisk_conf_dao.find_sip_trunk_settings()
-        for endpoint in endpoints:
+        for endpoint in _consume(endpoints):
             name = endpoint['name']
             label = endpoint.get('label')
             endpoint_section_options = endpoint.get('endpoint_section_options', [])
@@ -103,3 +112,15 @@ class PJSIPConfGenerator:
 
                 writer.write_section(sections[key])
                 writer.write_options(options)
+
+
+def _consume(endpoints):
+    # Each endpoint is released once written, so that the rows returned by the
+    # DAO and the generated text are not both entirely held in memory.
+    if not isinstance(endpoints, list):
+        yield from endpoints
+        return
+
+    endpoints.reverse()
+    while endpoints:
+        yield endpoints.pop()
@@ -1,9 +1,12 @@
-# Copyright 2019-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import os
 import tempfile
 import unittest
+from unittest.mock import patch
+
+from hamcrest import assert_that, equal_to, none
 
 from wazo_confgend.generators.tests.util import assert_config_equal
 
@@ -49,3 +52,29 @@ class TestModulesConfGenerator(unittest.TestCase):
             chan_skinny.so
         ''',
         )
+
+    def test_generate_reuses_compiled_template(self):
+        self.generator.generate()
+
+        with patch('wazo_confgend.plugins.modules_conf.Template') as Template:
+            self.generator.generate()
+
+        Template.assert_not_called()
+
+    def test_generate_reloads_modified_template(self):
+        self.generator.generate()
+        with open(self.template_filename, 'w') as f:
+            f.write('{{ modules | join(",") }}')
+        os.utime(self.template_filename, ns=(0, 0))
+
+        result = self.generator.generate()
+
+        assert_that(result, equal_to('chan_sip.so,chan_skinny.so'))
+
+    def test_generate_missing_template(self):
+        os.unlink(self.template_filename)
+
+        assert_that(self.generator.generate(), none())
+
+        with open(self.template_filename, 'wb') as f:
+            f.write(TEMPLATE)
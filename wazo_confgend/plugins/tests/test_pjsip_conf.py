@@ -6,6 +6,7 @@ from collections import namedtuple
 from io import StringIO
 from unittest.mock import patch
 
+from hamcrest import assert_that, empty
 from xivo_dao.alchemy.pjsip_transport import PJSIPTransport
 
 from wazo_confgend.generators.tests.util import assert_config_equal
@@ -146,6 +147,29 @@ class TestPJSIPConfGenerator(unittest.TestCase):
                 ),
             )
 
+    def test_generate_lines_releases_written_endpoints(self):
+        output = StringIO()
+        endpoints = [
+            {'name': name, 'endpoint_section_options': [['type', 'endpoint']]}
+            for name in ('abcdef', 'defbca')
+        ]
+        with patch('wazo_confgend.plugins.pjsip_conf.asterisk_conf_dao') as dao:
+            dao.find_sip_user_settings.return_value = endpoints
+
+            self.generator.generate_lines(output)
+
+        assert_that(endpoints, empty())
+        assert_config_equal(
+            output.getvalue(),
+            '''\
+            [abcdef]
+            type = endpoint
+
+            [defbca]
+            type = endpoint
+            ''',
+        )
+
     def test_generate_meeting_guests(self):
         output = StringIO()
         name_1 = 'abcdeféèìïöçàäỳÿüùúóíá'
@@ -1,10 +1,12 @@
-# Copyright 2019-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import textwrap
 import unittest
 from unittest.mock import Mock, patch
 
+from hamcrest import assert_that, contains_exactly, equal_to
+
 from wazo_confgend.generators.tests.util import assert_config_equal
 
 from ..provd_conf import ProvdNetworkConfGenerator
@@ -15,27 +17,22 @@ class TestProvdNetworkConf(unittest.TestCase):
         dependencies = {'config': {}}
         self.generator = ProvdNetworkConfGenerator(dependencies)
 
-    @patch('wazo_confgend.plugins.provd_conf.session_scope')
-    def test_net4_ip_in_provisioning(self, session_scope):
-        session_scope.__enter__ = Mock(return_value=Mock())
-        session_scope.__exit__ = Mock(return_value=None)
-
-        with patch.object(
-            self.generator, 'get_provd_net4_ip'
-        ) as provd_net4_ip, patch.object(
-            self.generator, 'get_provd_http_port'
-        ) as provd_http_port, patch.object(
-            self.generator, 'get_netiface_net4_ip'
-        ) as netiface_net4_ip, patch.object(
-            self.generator, 'get_provd_http_base_url'
-        ) as provd_http_base_url:
-            provd_net4_ip.return_value = '10.0.0.254'
-            provd_http_base_url.return_value = None
-            provd_http_port.return_value = None
-            netiface_net4_ip.return_value = None
-
+    def _generate(self, **settings):
+        settings.setdefault('http_base_url', None)
+        settings.setdefault('net4_ip', None)
+        settings.setdefault('http_port', None)
+        settings.setdefault('voip_address', None)
+        with patch('wazo_confgend.plugins.provd_conf.session_scope'), patch.object(
+            self.generator, 'get_network_settings', return_value=Mock(**settings)
+        ) as get_network_settings:
             value = self.generator.generate()
 
+        get_network_settings.assert_called_once()
+        return value
+
+    def test_net4_ip_in_provisioning(self):
+        value = self._generate(net4_ip='10.0.0.254')
+
         assert_config_equal(
             value,
             textwrap.dedent(
@@ -46,26 +43,8 @@ class TestProvdNetworkConf(unittest.TestCase):
             ),
         )
 
-    @patch('wazo_confgend.plugins.provd_conf.session_scope')
-    def test_net4_ip_in_netiface(self, session_scope):
-        session_scope.__enter__ = Mock(return_value=Mock())
-        session_scope.__exit__ = Mock(return_value=None)
-
-        with patch.object(
-            self.generator, 'get_provd_net4_ip'
-        ) as provd_net4_ip, patch.object(
-            self.generator, 'get_netiface_net4_ip'
-        ) as netiface_net4_ip, patch.object(
-            self.generator, 'get_provd_http_port'
-        ) as provd_http_port, patch.object(
-            self.generator, 'get_provd_http_base_url'
-        ) as provd_http_base_url:
-            provd_net4_ip.return_value = None
-            provd_http_base_url.return_value = None
-            provd_http_port.return_value = None
-            netiface_net4_ip.return_value = '10.0.0.250'
-
-            value = self.generator.generate()
+    def test_net4_ip_in_netiface(self):
+        value = self._generate(voip_address='10.0.0.250')
 
         assert_config_equal(
             value,
@@ -77,26 +56,10 @@ class TestProvdNetworkConf(unittest.TestCase):
             ),
         )
 
-    @patch('wazo_confgend.plugins.provd_conf.session_scope')
-    def test_get_provd_http_base_url(self, session_scope):
-        session_scope.__enter__ = Mock(return_value=Mock())
-        session_scope.__exit__ = Mock(return_value=None)
-
-        with patch.object(
-            self.generator, 'get_provd_net4_ip'
-        ) as provd_net4_ip, patch.object(
-            self.generator, 'get_netiface_net4_ip'
-        ) as netiface_net4_ip, patch.object(
-            self.generator, 'get_provd_http_port'
-        ) as provd_http_port, patch.object(
-            self.generator, 'get_provd_http_base_url'
-        ) as provd_http_base_url:
-            provd_net4_ip.return_value = None
-            provd_http_base_url.return_value = 'https://10.0.0.242/custom'
-            provd_http_port.return_value = None
-            netiface_net4_ip.return_value = None
-
-            value = self.generator.generate()
+    def test_get_provd_http_base_url(self):
+        value = self._generate(
+            http_base_url='https://10.0.0.242/custom', net4_ip='10.0.0.254'
+        )
 
         assert_config_equal(
             value,
@@ -108,26 +71,10 @@ class TestProvdNetworkConf(unittest.TestCase):
             ),
         )
 
-    @patch('wazo_confgend.plugins.provd_conf.session_scope')
-    def test_no_http_base_url(self, session_scope):
-        session_scope.__enter__ = Mock(return_value=Mock())
-        session_scope.__exit__ = Mock(return_value=None)
-
-        with patch.object(
-            self.generator, 'get_provd_net4_ip'
-        ) as provd_net4_ip, patch.object(
-            self.generator, 'get_netiface_net4_ip'
-        ) as netiface_net4_ip, patch.object(
-            self.generator, 'get_provd_http_port'
-        ) as provd_http_port, patch.object(
-            self.generator, 'get_provd_http_base_url'
-        ) as provd_http_base_url:
-            provd_net4_ip.return_value = '10.0.0.254'
-            provd_http_base_url.return_value = None
-            provd_http_port.return_value = 8666
-            netiface_net4_ip.return_value = '10.0.0.222'
-
-            value = self.generator.generate()
+    def test_no_http_base_url(self):
+        value = self._generate(
+            net4_ip='10.0.0.254', http_port=8666, voip_address='10.0.0.222'
+        )
 
         assert_config_equal(
             value,
@@ -139,25 +86,19 @@ class TestProvdNetworkConf(unittest.TestCase):
             ),
         )
 
-    @patch('wazo_confgend.plugins.provd_conf.session_scope')
-    def test_no_advertised_host(self, session_scope):
-        session_scope.__enter__ = Mock(return_value=Mock())
-        session_scope.__exit__ = Mock(return_value=None)
-
-        with patch.object(
-            self.generator, 'get_provd_net4_ip'
-        ) as provd_net4_ip, patch.object(
-            self.generator, 'get_provd_http_port'
-        ) as provd_http_port, patch.object(
-            self.generator, 'get_netiface_net4_ip'
-        ) as netiface_net4_ip, patch.object(
-            self.generator, 'get_provd_http_base_url'
-        ) as provd_http_base_url:
-            provd_net4_ip.return_value = None
-            provd_http_base_url.return_value = None
-            provd_http_port.return_value = None
-            netiface_net4_ip.return_value = None
-
-            value = self.generator.generate()
+    def test_no_advertised_host(self):
+        value = self._generate(http_port=8666)
 
         assert_config_equal(value, '{}')
+
+    def test_network_settings_are_fetched_in_one_query(self):
+        session = Mock()
+
+        result = self.generator.get_network_settings(session)
+
+        session.query.assert_called_once()
+        assert_that(
+            [column.name for column in session.query.call_args.args],
+            contains_exactly('http_base_url', 'net4_ip', 'http_port', 'voip_address'),
+        )
+        assert_that(result, equal_to(session.query.return_value.one.return_value))
@@ -0,0 +1,62 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Profiling of a single generation, requested with the "profile" argument"""
+
+from __future__ import annotations
+
+import cProfile
+import datetime
+import logging
+import os
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    """Runs a function under cProfile and writes the stats in `directory`.
+
+    When `tracemalloc_top` is set, the biggest allocation sites left at the
+    end of the run are written next to the stats. Only one profile runs at a
+    time, since tracemalloc traces every thread of the process.
+    """
+
+    def __init__(self, directory, tracemalloc_top=0):
+        self._directory = directory
+        self._tracemalloc_top = tracemalloc_top
+        self._lock = threading.Lock()
+
+    def run(self, name, f, *args):
+        with self._lock:
+            return self._run(name, f, *args)
+
+    def _run(self, name, f, *args):
+        os.makedirs(self._directory, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        basename = os.path.join(
+            self._directory, f"{name.replace('/', '.')}-{timestamp}"
+        )
+
+        trace_malloc = self._tracemalloc_top and not tracemalloc.is_tracing()
+        if trace_malloc:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(f, *args)
+        finally:
+            stats_filename = f'{basename}.pstats'
+            profile.dump_stats(stats_filename)
+            logger.info("Profile of %s written to %s", name, stats_filename)
+            if trace_malloc:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self._dump_allocations(name, snapshot, f'{basename}.tracemalloc')
+
+    def _dump_allocations(self, name, snapshot, filename):
+        top_stats = snapshot.statistics('lineno')[: self._tracemalloc_top]
+        with open(filename, 'w') as f:
+            for stat in top_stats:
+                f.write(f'{stat}\n')
+        logger.info("Allocations of %s written to %s", name, filename)
@@ -0,0 +1,120 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Capture of the SQL statements and DAO calls of a generation
+
+Used to explain slow generations: the statements are grouped by text, so an
+N+1 query shows up as one statement run many times.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import threading
+from collections.abc import Mapping
+
+from wazo_confgend import timing
+
+_current_log = contextvars.ContextVar('current_query_log', default=None)
+_instrument_lock = threading.Lock()
+
+
+class QueryLog:
+    def __init__(self):
+        # statement -> [count, seconds]
+        self._statements = {}
+        # DAO function name -> [calls, rows]
+        self._dao_calls = {}
+
+    def add_statement(self, statement, seconds):
+        stats = self._statements.setdefault(statement, [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+
+    def add_dao_call(self, name, rows):
+        stats = self._dao_calls.setdefault(name, [0, 0])
+        stats[0] += 1
+        stats[1] += rows
+
+    @property
+    def query_count(self):
+        return sum(count for count, _ in self._statements.values())
+
+    @property
+    def query_time(self):
+        return sum(seconds for _, seconds in self._statements.values())
+
+    def slowest_statements(self, limit):
+        """Return (statement, count, seconds) tuples by decreasing cumulative time"""
+        statements = sorted(
+            self._statements.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return [
+            (statement, count, seconds)
+            for statement, (count, seconds) in statements[:limit]
+        ]
+
+    def dao_calls(self):
+        """Return (name, calls, rows) tuples in the order of the first call"""
+        return [(name, calls, rows) for name, (calls, rows) in self._dao_calls.items()]
+
+
+@contextlib.contextmanager
+def capture():
+    query_log = QueryLog()
+    token = _current_log.set(query_log)
+    try:
+        yield query_log
+    finally:
+        _current_log.reset(token)
+
+
+def _count_rows(result):
+    # the bulk DAO return their rows grouped by context or queue
+    if isinstance(result, Mapping):
+        return sum(len(rows) for rows in result.values())
+    return len(result)
+
+
+def _wrap_dao_function(name, f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        result = f(*args, **kwargs)
+        query_log = _current_log.get()
+        if query_log is not None:
+            try:
+                rows = _count_rows(result)
+            except TypeError:
+                pass
+            else:
+                query_log.add_dao_call(name, rows)
+        return result
+
+    wrapper._querylog_wrapped = True
+    return wrapper
+
+
+def instrument_dao(module):
+    """Count the rows returned by the find_* functions of a DAO module"""
+    prefix = module.__name__.rsplit('.', 1)[-1]
+    with _instrument_lock:
+        for name in dir(module):
+            f = getattr(module, name)
+            if not name.startswith('find_') or not callable(f):
+                continue
+            if getattr(f, '_querylog_wrapped', False):
+                continue
+            setattr(module, name, _wrap_dao_function(f'{prefix}.{name}', f))
+
+
+def _add_statement(statement, seconds):
+    query_log = _current_log.get()
+    if query_log is not None:
+        query_log.add_statement(statement, seconds)
+
+
+def instrument_queries():
+    """Capture the statements run on every engine while a log is active"""
+    timing.observe_queries(_add_statement)
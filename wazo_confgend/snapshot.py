@@ -0,0 +1,58 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""One PostgreSQL snapshot shared by every transaction of a block
+
+The snapshot is exported by a transaction kept open on a dedicated connection
+and imported by each transaction begun in the block. The handlers may then
+open and close their own session_scope: a new transaction still sees the same
+data, and a failed statement only aborts the transaction it was run in.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_ISOLATION_LEVEL = 'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'
+
+_current_snapshot = contextvars.ContextVar('current_snapshot', default=None)
+_instrument_lock = threading.Lock()
+
+
+def _import_snapshot(conn):
+    snapshot_id = _current_snapshot.get()
+    if snapshot_id is None:
+        return
+
+    # the statements must be the first ones of the transaction
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(_ISOLATION_LEVEL)
+        cursor.execute('SET TRANSACTION SNAPSHOT %s', (snapshot_id,))
+    finally:
+        cursor.close()
+
+
+def _instrument_transactions():
+    with _instrument_lock:
+        if not event.contains(Engine, 'begin', _import_snapshot):
+            event.listen(Engine, 'begin', _import_snapshot)
+
+
+@contextlib.contextmanager
+def shared(engine):
+    """Run every transaction begun in the block in the same snapshot"""
+    _instrument_transactions()
+    with engine.connect() as conn, conn.begin():
+        conn.exec_driver_sql(_ISOLATION_LEVEL)
+        snapshot_id = conn.exec_driver_sql('SELECT pg_export_snapshot()').scalar()
+        token = _current_snapshot.set(snapshot_id)
+        try:
+            yield snapshot_id
+        finally:
+            _current_snapshot.reset(token)
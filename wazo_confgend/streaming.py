@@ -0,0 +1,109 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from twisted.internet import reactor
+from twisted.internet.interfaces import IPushProducer
+from zope.interface import implementer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_PAUSE_TIMEOUT = 60
+# chunks handed to the reactor and not yet written to the consumer
+DEFAULT_MAX_PENDING_CHUNKS = 2
+
+
+class StreamAborted(Exception):
+    pass
+
+
+class NothingStreamed(Exception):
+    pass
+
+
+@implementer(IPushProducer)
+class StreamingOutput:
+    """File-like object sending what is written to a Twisted consumer by chunks.
+
+    write() is called by a generator running in a worker thread. Chunks are
+    handed to the consumer in the reactor thread. The writer blocks while
+    `max_pending_chunks` chunks are not yet written by the reactor, and while
+    the consumer asks the producer to pause, which keeps at most a few chunks
+    in memory whatever the size of the generated file. Every chunk is also
+    written to `tee`, if given.
+    """
+
+    def __init__(
+        self,
+        consumer,
+        tee=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        pause_timeout=DEFAULT_PAUSE_TIMEOUT,
+        call_from_thread=None,
+        max_pending_chunks=DEFAULT_MAX_PENDING_CHUNKS,
+    ):
+        self._consumer = consumer
+        self._tee = tee
+        self._chunk_size = chunk_size
+        self._pause_timeout = pause_timeout
+        self._call_from_thread = call_from_thread or reactor.callFromThread
+        self._buffer = []
+        self._buffered = 0
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._pending_chunks = threading.BoundedSemaphore(max_pending_chunks)
+        self._stopped = False
+        self.bytes_written = 0
+
+    def pauseProducing(self):
+        self._resumed.clear()
+
+    def resumeProducing(self):
+        self._resumed.set()
+
+    def stopProducing(self):
+        self._stopped = True
+        self._resumed.set()
+
+    def write(self, data: str):
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        content = ''.join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        if not self._pending_chunks.acquire(timeout=self._pause_timeout):
+            raise StreamAborted('reactor did not write the chunks in time')
+        try:
+            if not self._resumed.wait(self._pause_timeout):
+                raise StreamAborted('consumer paused for too long')
+            if self._stopped:
+                raise StreamAborted('consumer stopped the stream')
+        except StreamAborted:
+            self._pending_chunks.release()
+            raise
+
+        chunk = content.encode('utf-8')
+        self._call_from_thread(self._write_chunk, chunk)
+        self.bytes_written += len(chunk)
+        if self._tee is not None:
+            self._tee.write(content)
+
+    def _write_chunk(self, chunk):
+        # called in the reactor thread
+        try:
+            self._consumer.write(chunk)
+        finally:
+            self._pending_chunks.release()
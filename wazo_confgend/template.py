@@ -1,37 +1,85 @@
-# Copyright 2016-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
-from jinja2 import ChoiceLoader, Environment, FileSystemLoader, PackageLoader
+import os
+import threading
 
+from jinja2 import (
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    PackageLoader,
+)
 
-def new_template_helper():
+TEMPLATES_DIR = '/etc/wazo-confgend/templates'
+
+
+def new_template_helper(bytecode_cache_dir=None):
     loader = ChoiceLoader(
         [
-            FileSystemLoader('/etc/wazo-confgend/templates'),
+            FileSystemLoader(TEMPLATES_DIR),
             PackageLoader(__name__, 'templates'),
         ]
     )
-    return TemplateHelper(loader)
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    return TemplateHelper(loader, bytecode_cache)
 
 
 class TemplateHelper:
-    def __init__(self, loader):
-        self._env = Environment(loader=loader)
+    def __init__(self, loader, bytecode_cache=None):
+        self._env = Environment(loader=loader, bytecode_cache=bytecode_cache)
+        self._search_paths = _get_search_paths(loader)
+        self._customizable_templates = {}
+        self._lock = threading.Lock()
 
     def get_template(self, name):
         filename = f'{name}.jinja'
         return _Template(self._env.get_template(filename))
 
     def get_customizable_template(self, name, custom_part):
+        # a custom template may be added at any time, so the lookup is only
+        # reused while the directories it could be added to are unchanged
+        key = (name, custom_part)
+        directories_mtime = self._get_directories_mtime(name)
+        with self._lock:
+            cached = self._customizable_templates.get(key)
+        if cached is not None:
+            mtime, jinja_template = cached
+            if mtime == directories_mtime and jinja_template.is_up_to_date:
+                return _Template(jinja_template)
+
         filename = f'{name}.jinja'
         filename_custom = f'{name}-{custom_part}.jinja'
-        return _Template(self._env.select_template([filename_custom, filename]))
+        jinja_template = self._env.select_template([filename_custom, filename])
+        with self._lock:
+            self._customizable_templates[key] = (directories_mtime, jinja_template)
+        return _Template(jinja_template)
 
     def get_legacy_contexts_conf(self):
         # TODO return contextsconf as an OrderedRawConf like previously...
         pass
 
+    def _get_directories_mtime(self, name):
+        result = []
+        for search_path in self._search_paths:
+            directory = os.path.join(search_path, os.path.dirname(name))
+            try:
+                result.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                result.append(None)
+        return tuple(result)
+
+
+def _get_search_paths(loader):
+    if isinstance(loader, ChoiceLoader):
+        return [path for sub in loader.loaders for path in _get_search_paths(sub)]
+    return list(getattr(loader, 'searchpath', []))
+
 
 class _Template:
     def __init__(self, jinja_template):
@@ -1,10 +1,13 @@
-# Copyright 2011-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2011-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
 import unittest
+from io import StringIO
 from unittest.mock import Mock, patch
 
+from hamcrest import assert_that, none
+
 from wazo_confgend.asterisk import AsteriskFrontend
 from wazo_confgend.generators.tests.util import assert_config_equal
 
@@ -50,3 +53,26 @@ class Test(unittest.TestCase):
             """,
         )
         find_queue_skillrule_settings.assert_called_once_with()
+
+    @patch(
+        'wazo_confgend.bulk_dao.find_queue_members_settings_by_queue',
+        Mock(return_value={}),
+    )
+    @patch('xivo_dao.asterisk_conf_dao.find_queue_settings', Mock(return_value=[]))
+    @patch('xivo_dao.asterisk_conf_dao.find_queue_general_settings')
+    def test_conf_written_to_output(self, find_queue_general_settings):
+        find_queue_general_settings.return_value = [
+            {'var_name': 'autofill', 'var_val': 'no'},
+        ]
+        output = StringIO()
+
+        result = self.asteriskFrontEnd.queues_conf(output=output)
+
+        assert_that(result, none())
+        assert_config_equal(
+            output.getvalue(),
+            """
+            [general]
+            autofill = no
+            """,
+        )
@@ -0,0 +1,48 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+
+from hamcrest import assert_that, equal_to
+
+from ..bulk_dao import _group_queue_members
+
+
+class TestGroupQueueMembers(unittest.TestCase):
+    def test_users_come_first_with_their_hint_as_state_interface(self):
+        user_rows = [
+            ('queue-1', 1, '83f38716-27d8-45c5-8fa6-5c7cb18acb26'),
+            ('queue-2', 0, '0486beeb-4e3d-415b-b32d-660f44f6bab8'),
+        ]
+        other_rows = [
+            ('queue-1', 2, 'PJSIP/abc'),
+            ('queue-1', 0, 'Local/id-1@agentcallback'),
+        ]
+
+        result = _group_queue_members(user_rows, other_rows)
+
+        assert_that(
+            result,
+            equal_to(
+                {
+                    'queue-1': [
+                        (
+                            'Local/83f38716-27d8-45c5-8fa6-5c7cb18acb26@usersharedlines',
+                            '1',
+                            '',
+                            'hint:83f38716-27d8-45c5-8fa6-5c7cb18acb26@usersharedlines',
+                        ),
+                        ('PJSIP/abc', '2', '', ''),
+                        ('Local/id-1@agentcallback', '0', '', ''),
+                    ],
+                    'queue-2': [
+                        (
+                            'Local/0486beeb-4e3d-415b-b32d-660f44f6bab8@usersharedlines',
+                            '0',
+                            '',
+                            'hint:0486beeb-4e3d-415b-b32d-660f44f6bab8@usersharedlines',
+                        ),
+                    ],
+                }
+            ),
+        )
@@ -0,0 +1,257 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from hamcrest import (
+    assert_that,
+    calling,
+    close_to,
+    empty,
+    equal_to,
+    has_entry,
+    none,
+    only_contains,
+    raises,
+)
+
+from ..cache import FileCache, MemoryCache, content_hash
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.basedir = tempfile.TemporaryDirectory()
+        self.cache = FileCache(self.basedir.name)
+
+    def tearDown(self):
+        self.basedir.cleanup()
+
+    def test_get_missing(self):
+        assert_that(self.cache.get('resource/filename.conf'), none())
+
+    def test_put_and_get(self):
+        self.cache.put('resource/filename.conf', 'contenté')
+
+        assert_that(self.cache.get('resource/filename.conf'), equal_to('contenté'))
+
+    def test_put_replaces_the_entry(self):
+        self.cache.put('resource/filename.conf', 'old content')
+        path = os.path.join(self.basedir.name, 'resource', 'filename.conf')
+        with open(path) as f:
+            self.cache.put('resource/filename.conf', 'new content')
+
+            assert_that(f.read(), equal_to('old content'))
+
+        assert_that(self.cache.get('resource/filename.conf'), equal_to('new content'))
+        assert_that(
+            sorted(os.listdir(os.path.join(self.basedir.name, 'resource'))),
+            equal_to(['filename.conf', 'filename.conf.blake2b']),
+        )
+
+    def test_invalidate(self):
+        self.cache.put('resource/filename.conf', 'content')
+
+        self.cache.invalidate('resource/filename.conf')
+
+        assert_that(self.cache.get('resource/filename.conf'), none())
+
+    def test_get_mtime(self):
+        assert_that(self.cache.get_mtime('resource/filename.conf'), none())
+
+        self.cache.put('resource/filename.conf', 'content')
+
+        assert_that(
+            self.cache.get_mtime('resource/filename.conf'),
+            close_to(time.time(), 5),
+        )
+
+    def test_put_stores_the_content_hash(self):
+        assert_that(self.cache.get_hash('resource/filename.conf'), none())
+
+        self.cache.put('resource/filename.conf', 'contenté')
+
+        assert_that(
+            self.cache.get_hash('resource/filename.conf'),
+            equal_to(content_hash('contenté'.encode('utf-8'))),
+        )
+
+    def test_old_hash_is_removed_before_the_content_is_replaced(self):
+        self.cache.put('resource/filename.conf', 'old content')
+        hashes = []
+        replace = os.replace
+
+        def replace_and_get_hash(src, dst):
+            hashes.append(self.cache.get_hash('resource/filename.conf'))
+            replace(src, dst)
+            hashes.append(self.cache.get_hash('resource/filename.conf'))
+
+        with patch('os.replace', replace_and_get_hash):
+            self.cache.put('resource/filename.conf', 'new content')
+
+        assert_that(hashes, equal_to([None, None]))
+        assert_that(
+            self.cache.get_hash('resource/filename.conf'),
+            equal_to(content_hash('new content')),
+        )
+
+    def test_invalidate_removes_the_content_hash(self):
+        self.cache.put('resource/filename.conf', 'content')
+
+        self.cache.invalidate('resource/filename.conf')
+
+        assert_that(self.cache.get_hash('resource/filename.conf'), none())
+
+    def test_open_for_write_stores_the_content_hash(self):
+        with self.cache.open_for_write('resource/filename.conf') as f:
+            f.write('some ')
+            f.write('contenté')
+
+        assert_that(
+            self.cache.get_hash('resource/filename.conf'),
+            equal_to(content_hash('some contenté')),
+        )
+
+    def test_open_for_write(self):
+        self.cache.put('resource/filename.conf', 'old content')
+
+        with self.cache.open_for_write('resource/filename.conf') as f:
+            f.write('new ')
+            assert_that(
+                self.cache.get('resource/filename.conf'), equal_to('old content')
+            )
+            f.write('content')
+
+        assert_that(self.cache.get('resource/filename.conf'), equal_to('new content'))
+        assert_that(
+            sorted(os.listdir(os.path.join(self.basedir.name, 'resource'))),
+            equal_to(['filename.conf', 'filename.conf.blake2b']),
+        )
+
+    def test_open_for_write_error_keeps_previous_content(self):
+        self.cache.put('resource/filename.conf', 'old content')
+
+        def write_and_fail():
+            with self.cache.open_for_write('resource/filename.conf') as f:
+                f.write('new content')
+                raise RuntimeError()
+
+        assert_that(calling(write_and_fail), raises(RuntimeError))
+        assert_that(self.cache.get('resource/filename.conf'), equal_to('old content'))
+        assert_that(
+            sorted(os.listdir(os.path.join(self.basedir.name, 'resource'))),
+            equal_to(['filename.conf', 'filename.conf.blake2b']),
+        )
+
+
+class TestMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.backend = Mock(FileCache)
+        self.backend.get.return_value = None
+        self.cache = MemoryCache(self.backend, max_size=10)
+
+    def test_get_missing(self):
+        assert_that(self.cache.get('key'), none())
+
+        self.backend.get.assert_called_once_with('key')
+
+    def test_put_writes_through_and_keeps_encoded_content(self):
+        self.cache.put('key', 'é')
+
+        self.backend.put.assert_called_once_with('key', 'é')
+        assert_that(self.cache.get('key'), equal_to('é'.encode('utf-8')))
+        self.backend.get.assert_not_called()
+
+    def test_get_loads_from_backend_once(self):
+        self.backend.get.return_value = 'content'
+
+        assert_that(self.cache.get('key'), equal_to(b'content'))
+        assert_that(self.cache.get('key'), equal_to(b'content'))
+
+        self.backend.get.assert_called_once_with('key')
+
+    def test_get_does_not_keep_a_value_written_over_while_reading(self):
+        def get_while_writing(key):
+            self.cache.put(key, 'new')
+            return 'old'
+
+        self.backend.get.side_effect = get_while_writing
+
+        assert_that(self.cache.get('key'), equal_to(b'old'))
+        assert_that(self.cache.get('key'), equal_to(b'new'))
+
+    def test_get_does_not_keep_a_value_invalidated_while_reading(self):
+        def get_while_invalidating(key):
+            self.cache.invalidate(key)
+            return 'old'
+
+        self.backend.get.side_effect = get_while_invalidating
+
+        self.cache.get('key')
+        self.cache.get('key')
+
+        assert_that(self.backend.get.call_count, equal_to(2))
+
+    def test_invalidating_unknown_keys_keeps_no_state(self):
+        for i in range(100):
+            self.cache.invalidate(f'resource/{i}.conf')
+
+        assert_that(vars(self.cache), has_entry('_entries', empty()))
+        assert_that(
+            [value for value in vars(self.cache).values() if isinstance(value, dict)],
+            only_contains(empty()),
+        )
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.put('one', '1234')
+        self.cache.put('two', '1234')
+        self.cache.get('one')
+        self.cache.put('three', '1234')
+
+        assert_that(self.cache.get('one'), equal_to(b'1234'))
+        assert_that(self.cache.get('three'), equal_to(b'1234'))
+        assert_that(self.cache.get('two'), none())
+        self.backend.get.assert_called_once_with('two')
+
+    def test_entries_larger_than_the_budget_are_not_kept(self):
+        self.cache.put('key', '12345678901')
+        self.cache.get('key')
+
+        self.backend.get.assert_called_once_with('key')
+
+    def test_replacing_an_entry_updates_the_size(self):
+        self.cache.put('key', '123456')
+        self.cache.put('key', '1234567')
+        self.cache.put('other', '123')
+
+        assert_that(self.cache.get('key'), equal_to(b'1234567'))
+        assert_that(self.cache.get('other'), equal_to(b'123'))
+        self.backend.get.assert_not_called()
+
+    def test_invalidate(self):
+        self.cache.put('key', 'content')
+
+        self.cache.invalidate('key')
+
+        self.backend.invalidate.assert_called_once_with('key')
+        assert_that(self.cache.get('key'), none())
+
+    def test_open_for_write_discards_the_memory_copy(self):
+        basedir = tempfile.TemporaryDirectory()
+        self.addCleanup(basedir.cleanup)
+        self.cache = MemoryCache(FileCache(basedir.name), max_size=100)
+        self.cache.put('resource/key', 'old')
+
+        with self.cache.open_for_write('resource/key') as f:
+            f.write('new')
+
+        assert_that(self.cache.get('resource/key'), equal_to(b'new'))
+
+    def test_get_hash_from_backend(self):
+        assert_that(
+            self.cache.get_hash('key'), equal_to(self.backend.get_hash.return_value)
+        )
+        self.backend.get_hash.assert_called_once_with('key')
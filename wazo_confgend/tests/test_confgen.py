@@ -1,15 +1,40 @@
-# Copyright 2018-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2018-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
 import random
 import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import Mock
-
-from hamcrest import assert_that, calling, equal_to, raises
-
-from ..confgen import Confgen, ConfgendFactory
+from unittest.mock import ANY, MagicMock, Mock, call, patch
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    contains_string,
+    equal_to,
+    has_entries,
+    instance_of,
+    none,
+    not_,
+    raises,
+)
+from twisted.internet import defer
+
+from .. import querylog, streaming, timing
+from ..cache import MemoryCache, content_hash
+from ..confgen import (
+    MAX_PENDING_RESPONSES,
+    NOT_MODIFIED,
+    Confgen,
+    ConfgendFactory,
+    FramedConfgen,
+    FramedConfgendFactory,
+    format_bundle,
+)
+from ..handler import NullHandlerFactory, streamable
 
 
 def sample_unicode_string(length):
@@ -41,6 +66,9 @@ def sample_unicode_string(length):
 class TestConfgen(unittest.TestCase):
     def setUp(self):
         self.factory = Mock()
+        self.factory.defer_generate.side_effect = lambda *args: defer.succeed(
+            self.factory.generate(*args)
+        )
         self.transport = Mock()
         self.protocol = Confgen()
         self.protocol.factory = self.factory
@@ -55,6 +83,69 @@ class TestConfgen(unittest.TestCase):
         self.transport.write.assert_called_once_with(
             self.factory.generate.return_value.encode("utf-8")
         )
+        self.transport.loseConnection.assert_called_once_with()
+
+    def test_timing_is_recorded(self):
+        self.factory.generate.return_value = 'contenté'
+        cmd = b'resource/filename.conf cached\n'
+
+        self.protocol.dataReceived(cmd)
+
+        self.factory.record_timing.assert_called_once_with(
+            'resource/filename.conf', ANY
+        )
+        timer = self.factory.record_timing.call_args.args[1]
+        assert_that(timer.name, equal_to('resource/filename.conf cached'))
+        assert_that(timer.summary()['write']['bytes'], equal_to(9))
+
+    def test_receive_command_waits_for_deferred_generation(self):
+        d = defer.Deferred()
+        self.factory.defer_generate.side_effect = None
+        self.factory.defer_generate.return_value = d
+        cmd = b'resource/filename.conf\n'
+
+        self.protocol.dataReceived(cmd)
+
+        self.transport.write.assert_not_called()
+        self.transport.loseConnection.assert_not_called()
+
+        d.callback('some content')
+
+        self.transport.write.assert_called_once_with(b'some content')
+        self.transport.loseConnection.assert_called_once_with()
+
+    def test_receive_stream_command(self):
+        self.factory.defer_stream.return_value = defer.succeed(None)
+        cmd = b'resource/filename.conf stream\n'
+
+        self.protocol.dataReceived(cmd)
+
+        self.factory.defer_stream.assert_called_once_with(
+            'resource', 'filename.conf', self.transport, 'stream'
+        )
+        self.factory.generate.assert_not_called()
+        self.transport.write.assert_not_called()
+        self.transport.loseConnection.assert_called_once_with()
+
+    def test_receive_bundle_command(self):
+        self.factory.defer_bundle.return_value = defer.succeed(b'bundle content')
+        cmd = b'bundle resource/one.conf resource/two.conf\n'
+
+        self.protocol.dataReceived(cmd)
+
+        self.factory.defer_bundle.assert_called_once_with(
+            'resource/one.conf', 'resource/two.conf'
+        )
+        self.transport.write.assert_called_once_with(b'bundle content')
+        self.transport.loseConnection.assert_called_once_with()
+
+    def test_receive_command_with_encoded_content(self):
+        self.factory.generate.return_value = b'encoded content'
+        cmd = b'resource/filename.conf cached\n'
+
+        self.protocol.dataReceived(cmd)
+
+        self.transport.write.assert_called_once_with(b'encoded content')
 
     def test_receive_command_no_result(self):
         self.factory.generate.return_value = None
@@ -100,11 +191,162 @@ class TestConfgen(unittest.TestCase):
         )
 
 
+class TestFramedConfgen(unittest.TestCase):
+    def setUp(self):
+        self.factory = Mock()
+        self.transport = Mock(disconnecting=False)
+        self.protocol = FramedConfgen()
+        self.protocol.factory = self.factory
+        self.protocol.makeConnection(self.transport)
+
+    def written(self):
+        return b''.join(
+            b''.join(call.args[0])
+            for call in self.transport.writeSequence.call_args_list
+        )
+
+    def test_receive_many_commands(self):
+        self.factory.defer_generate.side_effect = [
+            defer.succeed('content 1'),
+            defer.succeed(None),
+            defer.succeed('contenté 3'),
+        ]
+
+        self.protocol.dataReceived(
+            b'resource/one.conf\nresource/two.conf arg1\nresource/three.conf\n'
+        )
+
+        self.factory.defer_generate.assert_any_call('resource', 'one.conf')
+        self.factory.defer_generate.assert_any_call('resource', 'two.conf', 'arg1')
+        self.factory.defer_generate.assert_any_call('resource', 'three.conf')
+        assert_that(
+            self.written(),
+            equal_to(
+                b'\x00\x00\x00\x09content 1'
+                b'\x00\x00\x00\x00'
+                b'\x00\x00\x00\x0bcontent\xc3\xa9 3'
+            ),
+        )
+        self.transport.loseConnection.assert_not_called()
+
+    def test_command_split_across_packets(self):
+        self.factory.defer_generate.return_value = defer.succeed('content')
+
+        self.protocol.dataReceived(b'resource/fil')
+        self.factory.defer_generate.assert_not_called()
+        self.protocol.dataReceived(b'ename.conf\r\n')
+
+        self.factory.defer_generate.assert_called_once_with('resource', 'filename.conf')
+        assert_that(self.written(), equal_to(b'\x00\x00\x00\x07content'))
+
+    def test_responses_are_written_in_order(self):
+        first, second = defer.Deferred(), defer.Deferred()
+        self.factory.defer_generate.side_effect = [first, second]
+
+        self.protocol.dataReceived(b'resource/one.conf\nresource/two.conf\n')
+        second.callback('two')
+        assert_that(self.written(), equal_to(b''))
+
+        first.callback('one')
+        assert_that(self.written(), equal_to(b'\x00\x00\x00\x03one\x00\x00\x00\x03two'))
+
+    def test_timing_is_recorded_once_written(self):
+        d = defer.Deferred()
+        self.factory.defer_generate.return_value = d
+
+        self.protocol.dataReceived(b'resource/one.conf\n')
+        self.factory.record_timing.assert_not_called()
+        d.callback('one')
+
+        self.factory.record_timing.assert_called_once_with('resource/one.conf', ANY)
+        timer = self.factory.record_timing.call_args.args[1]
+        assert_that(timer.summary()['write']['bytes'], equal_to(3))
+
+    def test_timing_is_not_recorded_on_error(self):
+        self.factory.defer_generate.return_value = defer.fail(Exception())
+
+        self.protocol.dataReceived(b'resource/one.conf\n')
+
+        self.factory.record_timing.assert_not_called()
+        assert_that(self.written(), equal_to(b'\x00\x00\x00\x00'))
+
+    def test_bundle_in_one_frame(self):
+        self.factory.defer_bundle.return_value = defer.succeed(b'a/b 1\nc')
+
+        self.protocol.dataReceived(b'bundle a/b\n')
+
+        self.factory.defer_bundle.assert_called_once_with('a/b')
+        assert_that(self.written(), equal_to(b'\x00\x00\x00\x07a/b 1\nc'))
+
+    def test_reading_is_paused_while_too_many_responses_are_pending(self):
+        generations = [defer.Deferred() for _ in range(MAX_PENDING_RESPONSES + 2)]
+        self.factory.defer_generate.side_effect = generations
+
+        self.protocol.dataReceived(b'resource/file.conf\n' * len(generations))
+
+        assert_that(
+            self.factory.defer_generate.call_count, equal_to(MAX_PENDING_RESPONSES)
+        )
+        self.transport.pauseProducing.assert_called_once_with()
+
+        generations[0].callback('content')
+
+        self.transport.resumeProducing.assert_called_once_with()
+        assert_that(
+            self.factory.defer_generate.call_count,
+            equal_to(MAX_PENDING_RESPONSES + 1),
+        )
+        assert_that(self.transport.pauseProducing.call_count, equal_to(2))
+
+    def test_reading_is_paused_while_the_client_does_not_read(self):
+        self.factory.defer_generate.return_value = defer.succeed('content')
+        self.transport.registerProducer.assert_called_once_with(self.protocol, True)
+
+        self.protocol.pauseProducing()
+        self.protocol.dataReceived(b'resource/one.conf\n')
+
+        self.factory.defer_generate.assert_not_called()
+
+        self.protocol.resumeProducing()
+
+        self.factory.defer_generate.assert_called_once_with('resource', 'one.conf')
+
+    def test_invalid_command_gets_an_empty_frame(self):
+        self.protocol.dataReceived(b'invalid\n')
+
+        self.factory.defer_generate.assert_not_called()
+        assert_that(self.written(), equal_to(b'\x00\x00\x00\x00'))
+
+
+class TestFramedConfgendFactory(unittest.TestCase):
+    def test_generation_is_delegated(self):
+        confgend_factory = Mock()
+        factory = FramedConfgendFactory(confgend_factory)
+
+        result = factory.defer_generate('resource', 'filename.conf', 'cached')
+
+        assert_that(result, equal_to(confgend_factory.defer_generate.return_value))
+        confgend_factory.defer_generate.assert_called_once_with(
+            'resource', 'filename.conf', 'cached'
+        )
+
+    def test_start_and_stop_the_confgend_factory(self):
+        confgend_factory = Mock()
+        factory = FramedConfgendFactory(confgend_factory)
+
+        factory.doStart()
+        factory.doStop()
+
+        confgend_factory.doStart.assert_called_once_with()
+        confgend_factory.doStop.assert_called_once_with()
+
+
 class TestConfgendFactory(unittest.TestCase):
     def setUp(self):
         config = {
             'templates': {'contextsconf': ''},
             'plugins': {},
+            'swr_max_age': 60,
         }
         cachedir = tempfile.gettempdir()
 
@@ -150,3 +392,548 @@ class TestConfgendFactory(unittest.TestCase):
 
         assert_that(result, equal_to(None))
         self.cache.invalidate.assert_called_once_with('test/myfile.yml')
+
+    def test_that_the_swr_argument_generates_when_no_cache(self):
+        self.handler.return_value = 'some content'
+        self.get_cached_content.return_value = None
+
+        result = self.factory.generate('test', 'myfile.yml', 'swr')
+
+        assert_that(result, equal_to('some content'))
+
+    @patch('wazo_confgend.confgen.reactor')
+    def test_that_the_swr_argument_returns_fresh_cached_content(self, reactor):
+        self.get_cached_content.return_value = 'cached content'
+        self.cache.get_mtime.return_value = time.time()
+
+        result = self.factory.generate('test', 'myfile.yml', 'swr')
+
+        assert_that(result, equal_to('cached content'))
+        self.handler.assert_not_called()
+        reactor.callInThread.assert_not_called()
+
+    @patch('wazo_confgend.confgen.reactor')
+    def test_that_the_swr_argument_revalidates_stale_cached_content(self, reactor):
+        self.get_cached_content.return_value = 'cached content'
+        self.cache.get_mtime.return_value = time.time() - 3600
+
+        result = self.factory.generate('test', 'myfile.yml', 'swr')
+
+        assert_that(result, equal_to('cached content'))
+        reactor.callInThread.assert_called_once_with(
+            self.factory._generate_and_cache, 'test/myfile.yml', 'test', 'myfile.yml'
+        )
+
+    def test_that_the_swr_argument_revalidates_in_the_worker_pool(self):
+        self.factory._threadpool = Mock()
+        self.get_cached_content.return_value = 'cached content'
+        self.cache.get_mtime.return_value = time.time() - 3600
+
+        self.factory.generate('test', 'myfile.yml', 'swr')
+
+        self.factory._threadpool.callInThread.assert_called_once_with(
+            self.factory._generate_and_cache, 'test/myfile.yml', 'test', 'myfile.yml'
+        )
+
+    @patch('wazo_confgend.confgen.reactor')
+    def test_that_the_swr_argument_does_not_revalidate_twice(self, reactor):
+        self.get_cached_content.return_value = 'cached content'
+        self.cache.get_mtime.return_value = time.time() - 3600
+        self.factory._in_flight['test/myfile.yml'] = Mock()
+
+        self.factory.generate('test', 'myfile.yml', 'swr')
+
+        reactor.callInThread.assert_not_called()
+
+    def test_if_none_match_with_unchanged_content(self):
+        self.handler.return_value = 'some content'
+        etag = content_hash('some content')
+
+        result = self.factory.generate('test', 'myfile.yml', f'if-none-match={etag}')
+
+        assert_that(result, equal_to(NOT_MODIFIED))
+        self.handler.assert_called_once_with()
+
+    def test_if_none_match_with_changed_content(self):
+        self.handler.return_value = 'some content'
+
+        result = self.factory.generate('test', 'myfile.yml', 'if-none-match=1234')
+
+        assert_that(result, equal_to('some content'))
+
+    def test_if_none_match_with_cached_hash(self):
+        self.cache.get_hash.return_value = '1234'
+
+        result = self.factory.generate(
+            'test', 'myfile.yml', 'cached', 'if-none-match=1234'
+        )
+
+        assert_that(result, equal_to(NOT_MODIFIED))
+        self.cache.get_hash.assert_called_once_with('test/myfile.yml')
+        self.get_cached_content.assert_not_called()
+        self.handler.assert_not_called()
+
+    def test_if_none_match_with_cached_content(self):
+        self.cache.get_hash.return_value = None
+        self.get_cached_content.return_value = b'cached content'
+        etag = content_hash('cached content')
+
+        result = self.factory.generate(
+            'test', 'myfile.yml', 'cached', f'if-none-match={etag}'
+        )
+
+        assert_that(result, equal_to(NOT_MODIFIED))
+
+    @patch('wazo_confgend.confgen.snapshot')
+    @patch('wazo_confgend.confgen.session_scope')
+    def test_bundle_generated_from_one_snapshot(self, session_scope, snapshot):
+        session = session_scope.return_value.__enter__.return_value
+        self.handler.side_effect = ['one', None, 'three']
+        self.get_cached_content.return_value = 'cached two'
+
+        with self.assertLogs('wazo_confgend.confgen', level='WARNING') as logs:
+            result = self.factory.bundle(
+                'test/one.conf', 'test/two.conf', 'test/three.conf'
+            )
+
+        assert_that(
+            result,
+            equal_to(
+                b'test/one.conf 3\none'
+                b'test/two.conf 10\ncached two'
+                b'test/three.conf 5\nthree'
+            ),
+        )
+        snapshot.shared.assert_called_once_with(session.get_bind.return_value)
+        # one scope to find the engine, then one per file
+        assert_that(session_scope.call_count, equal_to(4))
+        self.get_cached_content.assert_called_once_with('test/two.conf')
+        assert_that(logs.output, contains_exactly(contains_string('test/two.conf')))
+
+    @patch('wazo_confgend.confgen.snapshot', MagicMock())
+    @patch('wazo_confgend.confgen.session_scope', MagicMock())
+    def test_bundle_invalid_name(self):
+        self.handler.return_value = 'content'
+
+        result = self.factory.bundle('invalid', 'test/one.conf')
+
+        assert_that(result, equal_to(b'invalid 0\ntest/one.conf 7\ncontent'))
+
+    @patch('wazo_confgend.confgen.reactor')
+    def test_warm_up(self, reactor):
+        self.factory._config = {'plugins': {'asterisk.pjsip.conf': 'wazo'}}
+
+        self.factory.warm_up(['asterisk/extensions.conf', 'wazo/uuid.yml'])
+
+        self.handler_factory.get.assert_has_calls(
+            [
+                call('asterisk', 'pjsip.conf'),
+                call('asterisk', 'extensions.conf'),
+                call('wazo', 'uuid.yml'),
+            ]
+        )
+        reactor.callInThread.assert_called_once_with(
+            self.factory._warm_up_cache,
+            ['asterisk/extensions.conf', 'wazo/uuid.yml'],
+        )
+
+    def test_warm_up_cache(self):
+        self.handler.return_value = 'some content'
+
+        self.factory._warm_up_cache(['asterisk/extensions.conf', 'wazo/uuid.yml'])
+
+        self.cache.put.assert_has_calls(
+            [
+                call('asterisk/extensions.conf', 'some content'),
+                call('wazo/uuid.yml', 'some content'),
+            ]
+        )
+
+    def test_phases_of_a_generation_are_timed(self):
+        self.handler.return_value = 'some content'
+        timer = timing.RequestTimer('test/myfile.yml')
+
+        with timing.activate(timer):
+            self.factory.generate('test', 'myfile.yml')
+
+        summary = timer.summary()
+        assert_that(summary['lookup'], has_entries(count=1))
+        assert_that(summary['render'], has_entries(count=1, bytes=12))
+        assert_that(summary['cache'], has_entries(count=1, bytes=12))
+
+    def test_metrics_of_a_generation(self):
+        self.handler.return_value = 'some content'
+
+        self.factory.generate('test', 'myfile.yml', 'invalidate')
+        self.factory.generate('test', 'myfile.yml')
+        self.handler.side_effect = Exception()
+        self.factory.generate('test', 'myfile.yml')
+
+        exposition = self.factory.metrics.registry.exposition()
+        for sample in (
+            'wazo_confgend_requests_total{file="test/myfile.yml",mode="invalidate"} 1.0',
+            'wazo_confgend_requests_total{file="test/myfile.yml",mode="plain"} 2.0',
+            'wazo_confgend_generation_duration_seconds_count{file="test/myfile.yml"} 1',
+            'wazo_confgend_generated_bytes{file="test/myfile.yml"} 12.0',
+            'wazo_confgend_handler_errors_total{file="test/myfile.yml"} 1.0',
+            'wazo_confgend_generations_in_flight 0.0',
+        ):
+            assert_that(exposition, contains_string(sample))
+
+    def test_metrics_of_files_without_a_handler_are_grouped(self):
+        self.factory._handler_factory = NullHandlerFactory()
+        self.get_cached_content.return_value = None
+
+        self.factory.generate('test', 'myfile.yml')
+        self.factory.generate('test', 'other.yml')
+
+        exposition = self.factory.metrics.registry.exposition()
+        assert_that(
+            exposition,
+            contains_string(
+                'wazo_confgend_requests_total{file="unknown",mode="plain"} 2.0'
+            ),
+        )
+        assert_that(exposition, not_(contains_string('myfile.yml')))
+
+    def test_generations_in_flight(self):
+        in_flight = []
+
+        def handler():
+            in_flight.append(list(self.factory.metrics.in_flight.collect()))
+            return 'some content'
+
+        self.handler.side_effect = handler
+        self.factory._profiler = Mock()
+        self.factory._profiler.run.side_effect = lambda name, f, *args: f(*args)
+
+        self.factory.generate('test', 'myfile.yml', 'profile')
+
+        assert_that(
+            in_flight[0][-1],
+            equal_to('wazo_confgend_generations_in_flight 1.0'),
+        )
+        assert_that(
+            self.factory.metrics.registry.exposition(),
+            contains_string('wazo_confgend_generations_in_flight 0.0'),
+        )
+
+    def test_cache_metrics(self):
+        config = {'templates': {'contextsconf': ''}, 'plugins': {}}
+        factory = ConfgendFactory(tempfile.gettempdir(), config)
+        factory._handler_factory = Mock()
+        factory._cache = Mock()
+        factory._cache.get.side_effect = ['cached content', None]
+
+        factory._get_cached_content('test/myfile.yml')
+        factory._get_cached_content('test/myfile.yml')
+
+        exposition = factory.metrics.registry.exposition()
+        assert_that(
+            exposition,
+            contains_string(
+                'wazo_confgend_cache_hits_total{file="test/myfile.yml"} 1.0'
+            ),
+        )
+        assert_that(
+            exposition,
+            contains_string(
+                'wazo_confgend_cache_misses_total{file="test/myfile.yml"} 1.0'
+            ),
+        )
+
+    def test_record_timing(self):
+        timer = timing.RequestTimer('test/myfile.yml cached')
+        timer.stop()
+
+        self.factory.record_timing('test/myfile.yml', timer)
+
+        assert_that(
+            self.factory.timings.get('test/myfile.yml'), has_entries(requests=1)
+        )
+
+    def test_timings_without_a_handler_are_recorded_as_unknown(self):
+        self.factory._handler_factory = NullHandlerFactory()
+        timer = timing.RequestTimer('test/myfile.yml')
+        timer.stop()
+
+        self.factory.record_timing('test/myfile.yml', timer)
+        self.factory.record_timing('test/other.yml', timer)
+        self.factory.record_timing('invalid', timer)
+        self.factory.record_timing('bundle', timer)
+
+        assert_that(self.factory.timings.get('unknown'), has_entries(requests=3))
+        assert_that(self.factory.timings.get('bundle'), has_entries(requests=1))
+        assert_that(self.factory.timings.get('test/myfile.yml'), none())
+
+    def test_that_the_profile_argument_profiles_a_new_generation(self):
+        self.factory._profiler = Mock()
+        self.factory._profiler.run.side_effect = lambda name, f, *args: f(*args)
+        self.handler.return_value = 'some content'
+        self.get_cached_content.return_value = 'cached content'
+
+        result = self.factory.generate('test', 'myfile.yml', 'profile')
+
+        assert_that(result, equal_to('some content'))
+        self.factory._profiler.run.assert_called_once_with(
+            'test/myfile.yml',
+            self.factory._run_handler_and_cache,
+            'test/myfile.yml',
+            'test',
+            'myfile.yml',
+        )
+
+    def test_slow_generation_is_logged(self):
+        self.factory._slow_generation_threshold = 0.000001
+
+        def handler():
+            query_log = querylog._current_log.get()
+            query_log.add_statement('SELECT 1', 1.0)
+            query_log.add_dao_call('asterisk_conf_dao.find_users', 3)
+            time.sleep(0.001)
+            return 'some content'
+
+        self.handler_factory.get.return_value = handler
+
+        with self.assertLogs('wazo_confgend.confgen', level='WARNING') as logs:
+            self.factory.generate('test', 'myfile.yml')
+
+        assert_that(
+            logs.output,
+            contains_exactly(
+                contains_string('slow generation of test/myfile.yml in '),
+                contains_string('1 x 1.000 seconds: SELECT 1'),
+                contains_string(
+                    'asterisk_conf_dao.find_users returned 3 rows in 1 calls'
+                ),
+            ),
+        )
+
+    def test_fast_generation_is_not_logged(self):
+        self.factory._slow_generation_threshold = 3600
+        self.handler.return_value = 'some content'
+
+        with self.assertNoLogs('wazo_confgend.confgen', level='WARNING'):
+            self.factory.generate('test', 'myfile.yml')
+
+    def test_memory_cache(self):
+        config = {
+            'templates': {'contextsconf': ''},
+            'plugins': {},
+            'memory_cache_size': 1024,
+        }
+
+        factory = ConfgendFactory(tempfile.gettempdir(), config)
+
+        assert_that(factory._cache, instance_of(MemoryCache))
+
+    @patch('wazo_confgend.confgen.new_template_helper')
+    def test_template_bytecode_cache(self, new_template_helper):
+        config = {
+            'templates': {'contextsconf': ''},
+            'plugins': {},
+            'template_bytecode_cache': True,
+        }
+
+        ConfgendFactory('/var/cache/wazo-confgend', config)
+
+        new_template_helper.assert_called_once_with('/var/cache/wazo-confgend/.jinja')
+
+    def test_defer_generate_without_worker_pool(self):
+        self.handler.return_value = 'some content'
+
+        results = []
+        self.factory.defer_generate('test', 'myfile.yml').addCallback(results.append)
+
+        assert_that(results, equal_to(['some content']))
+
+    @patch('wazo_confgend.confgen.threads')
+    def test_defer_generate_with_worker_pool(self, threads):
+        config = {
+            'templates': {'contextsconf': ''},
+            'plugins': {},
+            'worker_pool_size': 4,
+        }
+        factory = ConfgendFactory(tempfile.gettempdir(), config)
+
+        result = factory.defer_generate('test', 'myfile.yml', 'cached')
+
+        assert_that(result, equal_to(threads.deferToThreadPool.return_value))
+        threads.deferToThreadPool.assert_called_once_with(
+            ANY, factory._threadpool, factory.generate, 'test', 'myfile.yml', 'cached'
+        )
+        assert_that(factory._threadpool.max, equal_to(4))
+
+    def test_requests_during_a_generation_share_the_next_one(self):
+        started, release = threading.Event(), threading.Event()
+        contents = iter(['first content', 'second content'])
+
+        def slow_handler():
+            started.set()
+            release.wait(timeout=5)
+            return next(contents)
+
+        self.handler.side_effect = slow_handler
+        results = []
+
+        def generate():
+            results.append(self.factory.generate('test', 'myfile.yml'))
+
+        leader = threading.Thread(target=generate)
+        leader.start()
+        started.wait(timeout=5)
+        started.clear()
+
+        waiting = threading.Semaphore(0)
+        wait_for_generation = self.factory._wait_for_generation
+
+        def wait(cache_key, future):
+            waiting.release()
+            wait_for_generation(cache_key, future)
+
+        self.factory._wait_for_generation = wait
+        followers = [threading.Thread(target=generate) for _ in range(3)]
+        for follower in followers:
+            follower.start()
+        for _ in followers:
+            waiting.acquire(timeout=5)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(timeout=5)
+
+        assert_that(
+            results,
+            contains_exactly('first content', *['second content'] * 3),
+        )
+        assert_that(self.handler.call_count, equal_to(2))
+        assert_that(self.factory._in_flight, equal_to({}))
+
+
+class TestFormatBundle(unittest.TestCase):
+    def test_format_bundle(self):
+        result = format_bundle(
+            [('a/one.conf', 'contenté'), ('a/two.conf', None), ('a/three.conf', 'x')]
+        )
+
+        assert_that(
+            result,
+            equal_to(
+                b'a/one.conf 9\ncontent\xc3\xa9' b'a/two.conf 0\n' b'a/three.conf 1\nx'
+            ),
+        )
+
+
+class TestConfgendFactoryStream(unittest.TestCase):
+    def setUp(self):
+        config = {
+            'templates': {'contextsconf': ''},
+            'plugins': {},
+        }
+        self.cachedir = tempfile.TemporaryDirectory()
+        self.factory = ConfgendFactory(self.cachedir.name, config)
+        self.factory._handler_factory = self.handler_factory = Mock()
+        self.consumer = Mock()
+        patcher = patch('wazo_confgend.confgen.reactor')
+        self.reactor = patcher.start()
+        self.reactor.callFromThread.side_effect = lambda f, *args: f(*args)
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cachedir.cleanup()
+
+    def streamed(self):
+        return b''.join(call.args[0] for call in self.consumer.write.call_args_list)
+
+    def test_streamable_handler_is_streamed_and_cached(self):
+        @streamable
+        def handler(output=None):
+            output.write('some ')
+            output.write('contenté')
+
+        self.handler_factory.get.return_value = handler
+
+        result = self.factory.stream('test', 'myfile.yml', self.consumer, 'stream')
+
+        assert_that(result, equal_to(None))
+        assert_that(self.streamed(), equal_to('some contenté'.encode('utf-8')))
+        self.consumer.registerProducer.assert_called_once_with(ANY, True)
+        self.consumer.unregisterProducer.assert_called_once_with()
+        assert_that(
+            self.factory._cache.get('test/myfile.yml'), equal_to('some contenté')
+        )
+
+    def test_not_streamable_handler_is_generated(self):
+        self.handler_factory.get.return_value = lambda: 'some content'
+
+        result = self.factory.stream('test', 'myfile.yml', self.consumer, 'stream')
+
+        assert_that(result, equal_to('some content'))
+        self.consumer.registerProducer.assert_not_called()
+
+    def test_if_none_match_is_served_by_a_plain_generation(self):
+        @streamable
+        def handler(output=None):
+            return 'some content'
+
+        self.handler_factory.get.return_value = handler
+        etag = content_hash('some content')
+
+        result = self.factory.stream(
+            'test', 'myfile.yml', self.consumer, 'stream', f'if-none-match={etag}'
+        )
+
+        assert_that(result, equal_to(NOT_MODIFIED))
+        self.consumer.registerProducer.assert_not_called()
+
+    def test_error_before_streaming_returns_cached_content(self):
+        @streamable
+        def handler(output=None):
+            raise Exception()
+
+        self.handler_factory.get.return_value = handler
+        self.factory._cache.put('test/myfile.yml', 'cached content')
+
+        result = self.factory.stream('test', 'myfile.yml', self.consumer, 'stream')
+
+        assert_that(result, equal_to('cached content'))
+        self.consumer.abortConnection.assert_not_called()
+
+    def test_error_while_streaming_aborts_the_connection(self):
+        @streamable
+        def handler(output=None):
+            output.write('a' * streaming.DEFAULT_CHUNK_SIZE)
+            raise Exception()
+
+        self.handler_factory.get.return_value = handler
+        self.factory._cache.put('test/myfile.yml', 'cached content')
+
+        result = self.factory.stream('test', 'myfile.yml', self.consumer, 'stream')
+
+        assert_that(result, equal_to(None))
+        self.consumer.abortConnection.assert_called_once_with()
+        self.consumer.unregisterProducer.assert_called_once_with()
+        assert_that(
+            self.factory._cache.get('test/myfile.yml'), equal_to('cached content')
+        )
+
+    def test_aborted_stream_is_not_a_handler_error(self):
+        @streamable
+        def handler(output=None):
+            output.write('a' * streaming.DEFAULT_CHUNK_SIZE)
+
+        def stop_producing(producer, streaming):
+            producer.stopProducing()
+
+        self.consumer.registerProducer.side_effect = stop_producing
+        self.handler_factory.get.return_value = handler
+
+        with self.assertNoLogs('wazo_confgend.confgen', level='ERROR'):
+            result = self.factory.stream('test', 'myfile.yml', self.consumer, 'stream')
+
+        assert_that(result, equal_to(None))
+        assert_that(self.streamed(), equal_to(b''))
+        self.consumer.abortConnection.assert_called_once_with()
+        exposition = self.factory.metrics.registry.exposition()
+        assert_that(
+            exposition, not_(contains_string('wazo_confgend_handler_errors_total{'))
+        )
@@ -1,4 +1,4 @@
-# Copyright 2016-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # Copyright (C) 2016 Proformatique Inc.
 # SPDX-License-Identifier: GPL-3.0-or-later
 
@@ -16,6 +16,7 @@ from ..handler import (
     NoSuchHandler,
     NullHandlerFactory,
     PluginHandlerFactory,
+    is_null_handler,
 )
 
 
@@ -158,3 +159,9 @@ class TestNullHandlerFactory(TestCase):
         result = factory.get(s.resource, s.filename)
 
         assert_that(result(), none())
+
+    def test_is_null_handler(self):
+        factory = NullHandlerFactory()
+
+        assert_that(is_null_handler(factory.get(s.resource, s.filename)))
+        assert_that(is_null_handler(lambda: 'content'), equal_to(False))
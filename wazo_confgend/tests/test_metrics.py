@@ -0,0 +1,92 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import textwrap
+import unittest
+from unittest.mock import Mock
+
+from hamcrest import assert_that, calling, contains_string, equal_to, raises
+
+from ..metrics import ConfgendMetrics, Counter, Gauge, Histogram, MetricsResource
+
+
+class TestCounter(unittest.TestCase):
+    def test_collect(self):
+        counter = Counter('requests_total', 'Requests.', ('file', 'mode'))
+        counter.inc('a/b.conf', 'cached')
+        counter.inc('a/b.conf', 'cached', amount=2)
+        counter.inc('a/"c".conf', 'plain')
+
+        assert_that(
+            '\n'.join(counter.collect()),
+            equal_to(
+                textwrap.dedent(
+                    '''\
+                    # HELP requests_total Requests.
+                    # TYPE requests_total counter
+                    requests_total{file="a/\\"c\\".conf",mode="plain"} 1.0
+                    requests_total{file="a/b.conf",mode="cached"} 3.0'''
+                )
+            ),
+        )
+
+    def test_wrong_labels(self):
+        counter = Counter('requests_total', 'Requests.', ('file', 'mode'))
+
+        assert_that(calling(counter.inc).with_args('a/b.conf'), raises(ValueError))
+
+
+class TestGauge(unittest.TestCase):
+    def test_track(self):
+        gauge = Gauge('in_flight', 'In flight.')
+
+        with gauge.track(), gauge.track():
+            assert_that(list(gauge.collect())[-1], equal_to('in_flight 2.0'))
+
+        assert_that(list(gauge.collect())[-1], equal_to('in_flight 0.0'))
+
+
+class TestHistogram(unittest.TestCase):
+    def test_collect(self):
+        histogram = Histogram('duration_seconds', 'Duration.', ('file',), (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value, 'a/b.conf')
+
+        assert_that(
+            '\n'.join(histogram.collect()),
+            equal_to(
+                textwrap.dedent(
+                    '''\
+                    # HELP duration_seconds Duration.
+                    # TYPE duration_seconds histogram
+                    duration_seconds_bucket{file="a/b.conf",le="0.1"} 2
+                    duration_seconds_bucket{file="a/b.conf",le="1.0"} 3
+                    duration_seconds_bucket{file="a/b.conf",le="+Inf"} 4
+                    duration_seconds_sum{file="a/b.conf"} 2.65
+                    duration_seconds_count{file="a/b.conf"} 4'''
+                )
+            ),
+        )
+
+
+class TestMetricsResource(unittest.TestCase):
+    def test_render(self):
+        metrics = ConfgendMetrics()
+        metrics.requests.inc('a/b.conf', 'plain')
+        request = Mock()
+
+        body = MetricsResource(metrics.registry).render_GET(request)
+
+        request.setHeader.assert_called_once_with(
+            b'content-type', b'text/plain; version=0.0.4; charset=utf-8'
+        )
+        assert_that(
+            body.decode('utf-8'),
+            contains_string(
+                'wazo_confgend_requests_total{file="a/b.conf",mode="plain"} 1.0\n'
+            ),
+        )
+        assert_that(
+            body.decode('utf-8'),
+            contains_string('wazo_confgend_generations_in_flight 0.0\n'),
+        )
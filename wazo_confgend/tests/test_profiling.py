@@ -0,0 +1,72 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import pstats
+import tempfile
+import unittest
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    ends_with,
+    equal_to,
+    has_item,
+    has_length,
+    raises,
+    starts_with,
+)
+
+from ..profiling import Profiler
+
+
+def generate(size):
+    return 'x' * size
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, '.profiles')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_run_writes_the_stats(self):
+        profiler = Profiler(self.directory)
+
+        result = profiler.run('asterisk/extensions.conf', generate, 3)
+
+        assert_that(result, equal_to('xxx'))
+        filenames = os.listdir(self.directory)
+        assert_that(filenames, contains_exactly(ends_with('.pstats')))
+        assert_that(filenames[0], starts_with('asterisk.extensions.conf-'))
+        stats = pstats.Stats(os.path.join(self.directory, filenames[0]))
+        assert_that(
+            [function for _, _, function in stats.stats],
+            has_item('generate'),
+        )
+
+    def test_run_writes_the_top_allocations(self):
+        profiler = Profiler(self.directory, tracemalloc_top=2)
+
+        profiler.run('asterisk/extensions.conf', generate, 1000)
+
+        [filename] = [
+            filename
+            for filename in os.listdir(self.directory)
+            if filename.endswith('.tracemalloc')
+        ]
+        with open(os.path.join(self.directory, filename)) as f:
+            assert_that(f.readlines(), has_length(2))
+
+    def test_stats_are_written_when_the_function_raises(self):
+        profiler = Profiler(self.directory)
+
+        assert_that(
+            calling(profiler.run).with_args('asterisk/extensions.conf', generate, None),
+            raises(TypeError),
+        )
+
+        assert_that(os.listdir(self.directory), has_length(1))
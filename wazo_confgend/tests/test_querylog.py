@@ -0,0 +1,101 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import types
+import unittest
+
+from hamcrest import assert_that, contains_exactly, empty, equal_to
+from sqlalchemy import create_engine, text
+
+from .. import querylog, timing
+
+
+class TestQueryLog(unittest.TestCase):
+    def test_slowest_statements(self):
+        query_log = querylog.QueryLog()
+        query_log.add_statement('SELECT 1', 0.5)
+        query_log.add_statement('SELECT 2', 0.25)
+        query_log.add_statement('SELECT 2', 0.5)
+        query_log.add_statement('SELECT 3', 0.125)
+
+        assert_that(
+            query_log.slowest_statements(2),
+            contains_exactly(('SELECT 2', 2, 0.75), ('SELECT 1', 1, 0.5)),
+        )
+        assert_that(query_log.query_count, equal_to(4))
+
+
+class TestInstrumentDao(unittest.TestCase):
+    def setUp(self):
+        self.dao = types.ModuleType('xivo_dao.some_dao')
+        self.dao.find_users = lambda: [{'id': 1}, {'id': 2}]
+        self.dao.find_members_by_queue = lambda: {'q1': [1, 2], 'q2': [3]}
+        self.dao.find_nothing = lambda: None
+        self.dao.get_user = lambda: {'id': 1}
+        querylog.instrument_dao(self.dao)
+
+    def test_rows_are_counted_while_capturing(self):
+        with querylog.capture() as query_log:
+            self.dao.find_users()
+            self.dao.find_users()
+            self.dao.find_members_by_queue()
+            self.dao.find_nothing()
+            self.dao.get_user()
+
+        assert_that(
+            query_log.dao_calls(),
+            contains_exactly(
+                ('some_dao.find_users', 2, 4),
+                ('some_dao.find_members_by_queue', 1, 3),
+            ),
+        )
+
+    def test_instrumenting_twice_counts_once(self):
+        querylog.instrument_dao(self.dao)
+
+        with querylog.capture() as query_log:
+            self.dao.find_users()
+
+        assert_that(query_log.dao_calls(), equal_to([('some_dao.find_users', 1, 2)]))
+
+    def test_nothing_is_counted_without_capture(self):
+        result = self.dao.find_users()
+
+        assert_that(result, equal_to([{'id': 1}, {'id': 2}]))
+
+
+class TestInstrumentQueries(unittest.TestCase):
+    def setUp(self):
+        querylog.instrument_queries()
+        self.engine = create_engine('sqlite://')
+
+    def test_statements_are_captured(self):
+        with self.engine.connect() as conn:
+            with querylog.capture() as query_log:
+                conn.execute(text('SELECT 1'))
+                conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+
+        [(statement, count, _)] = query_log.slowest_statements(10)
+        assert_that((statement, count), equal_to(('SELECT 1', 2)))
+
+    def test_nothing_is_captured_outside_of_a_capture(self):
+        with self.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            with querylog.capture() as query_log:
+                pass
+
+        assert_that(query_log.slowest_statements(10), empty())
+
+    def test_one_cursor_hook_serves_the_timing_and_the_log(self):
+        timing.instrument_queries()
+        timer = timing.RequestTimer('resource/filename.conf')
+
+        with self.engine.connect() as conn:
+            with timing.activate(timer), querylog.capture() as query_log:
+                conn.execute(text('SELECT 1'))
+            starts = conn.info[timing._QUERY_START_KEY]
+
+        assert_that(query_log.query_count, equal_to(1))
+        assert_that(timer.summary()['db']['count'], equal_to(1))
+        assert_that(starts, empty())
@@ -0,0 +1,52 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest.mock import MagicMock, Mock, call
+
+from hamcrest import assert_that, equal_to
+from sqlalchemy import create_engine, text
+
+from .. import snapshot
+
+
+class TestShared(unittest.TestCase):
+    def setUp(self):
+        self.engine = MagicMock()
+        self.conn = self.engine.connect.return_value.__enter__.return_value
+        self.conn.exec_driver_sql.return_value.scalar.return_value = '00000003-1'
+
+    def test_transactions_of_the_block_import_the_snapshot(self):
+        other_conn = Mock()
+        cursor = other_conn.connection.cursor.return_value
+
+        with snapshot.shared(self.engine) as snapshot_id:
+            snapshot._import_snapshot(other_conn)
+
+        assert_that(snapshot_id, equal_to('00000003-1'))
+        cursor.execute.assert_has_calls(
+            [
+                call('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'),
+                call('SET TRANSACTION SNAPSHOT %s', ('00000003-1',)),
+            ]
+        )
+        cursor.close.assert_called_once_with()
+
+    def test_transactions_outside_of_the_block_are_left_alone(self):
+        with snapshot.shared(self.engine):
+            pass
+        other_conn = Mock()
+
+        snapshot._import_snapshot(other_conn)
+
+        other_conn.connection.cursor.assert_not_called()
+
+    def test_other_engines_are_not_affected(self):
+        with snapshot.shared(self.engine):
+            pass
+        engine = create_engine('sqlite://')
+
+        with engine.begin() as conn:
+            result = conn.execute(text('SELECT 1')).scalar()
+
+        assert_that(result, equal_to(1))
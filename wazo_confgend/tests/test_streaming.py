@@ -0,0 +1,108 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+import threading
+import unittest
+from unittest.mock import Mock
+
+from hamcrest import assert_that, calling, equal_to, has_length, raises
+
+from ..streaming import StreamAborted, StreamingOutput
+
+
+def call_now(f, *args):
+    return f(*args)
+
+
+class TestStreamingOutput(unittest.TestCase):
+    def setUp(self):
+        self.consumer = Mock()
+        self.tee = io.StringIO()
+        self.output = StreamingOutput(
+            self.consumer, tee=self.tee, chunk_size=10, call_from_thread=call_now
+        )
+
+    def written(self):
+        return [call.args[0] for call in self.consumer.write.call_args_list]
+
+    def test_small_writes_are_buffered(self):
+        self.output.write('abc')
+        self.output.write('dé')
+
+        assert_that(self.written(), equal_to([]))
+
+        self.output.flush()
+
+        assert_that(self.written(), equal_to(['abcdé'.encode('utf-8')]))
+        assert_that(self.tee.getvalue(), equal_to('abcdé'))
+        assert_that(self.output.bytes_written, equal_to(6))
+
+    def test_chunks_are_sent_when_full(self):
+        self.output.write('0123456')
+        self.output.write('789abc')
+        self.output.write('de')
+        self.output.flush()
+
+        assert_that(self.written(), equal_to([b'0123456789abc', b'de']))
+        assert_that(self.tee.getvalue(), equal_to('0123456789abcde'))
+
+    def test_writer_waits_while_paused(self):
+        self.output.pauseProducing()
+        self.output.write('012345678')
+        writer = threading.Thread(target=self.output.flush)
+        writer.start()
+        writer.join(timeout=0.05)
+
+        assert_that(writer.is_alive(), equal_to(True))
+        assert_that(self.written(), equal_to([]))
+
+        self.output.resumeProducing()
+        writer.join(timeout=5)
+
+        assert_that(self.written(), equal_to([b'012345678']))
+
+    def test_writer_aborts_when_stopped(self):
+        self.output.stopProducing()
+
+        assert_that(
+            calling(self.output.write).with_args('0123456789'), raises(StreamAborted)
+        )
+        assert_that(self.tee.getvalue(), equal_to(''))
+
+    def test_writer_aborts_when_paused_for_too_long(self):
+        output = StreamingOutput(
+            self.consumer, chunk_size=1, pause_timeout=0.01, call_from_thread=call_now
+        )
+        output.pauseProducing()
+
+        assert_that(calling(output.write).with_args('a'), raises(StreamAborted))
+        self.consumer.write.assert_not_called()
+
+    def test_writer_blocks_while_the_reactor_does_not_write(self):
+        handed_off = []
+        output = StreamingOutput(
+            self.consumer,
+            chunk_size=1,
+            call_from_thread=lambda f, *args: handed_off.append((f, args)),
+            max_pending_chunks=2,
+        )
+
+        def write():
+            for data in 'abc':
+                output.write(data)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer.join(timeout=0.05)
+
+        assert_that(writer.is_alive(), equal_to(True))
+        assert_that(handed_off, has_length(2))
+
+        f, args = handed_off.pop(0)
+        f(*args)
+        writer.join(timeout=5)
+
+        assert_that(writer.is_alive(), equal_to(False))
+        assert_that(handed_off, has_length(2))
+        assert_that(self.written(), equal_to([b'a']))
@@ -1,15 +1,17 @@
-# Copyright 2016-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
 import os
+import tempfile
 from os.path import basename
 from unittest import TestCase
+from unittest.mock import patch
 
-from hamcrest import assert_that, contains_string, equal_to
-from jinja2 import PackageLoader, Template
+from hamcrest import assert_that, contains_string, equal_to, has_length
+from jinja2 import FileSystemLoader, PackageLoader, Template
 
-from ..template import TemplateHelper
+from ..template import TemplateHelper, new_template_helper
 
 
 class TestTemplateHelper(TestCase):
@@ -41,6 +43,61 @@ class TestTemplateHelper(TestCase):
 
         assert_that(output, contains_string('hello world'))
 
+    def test_get_customizable_template_is_memoized(self):
+        self.tpl_helper.get_customizable_template('foo', 'mrgbl')
+
+        with patch.object(self.tpl_helper._env, 'select_template') as select_template:
+            template = self.tpl_helper.get_customizable_template('foo', 'mrgbl')
+
+        select_template.assert_not_called()
+        assert_that(basename(template._jinja_template.filename), equal_to('foo.jinja'))
+
+
+class TestTemplateHelperCustomTemplates(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tpl_helper = TemplateHelper(FileSystemLoader(self.tmp_dir.name))
+        self._write('foo.jinja', 'default')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, filename, content, mtime_ns=None):
+        path = os.path.join(self.tmp_dir.name, filename)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_custom_template_added_after_lookup(self):
+        os.utime(self.tmp_dir.name, ns=(0, 0))
+        self.tpl_helper.get_customizable_template('foo', '42')
+
+        self._write('foo-42.jinja', 'custom')
+
+        template = self.tpl_helper.get_customizable_template('foo', '42')
+        assert_that(template.dump({}), equal_to('custom'))
+
+    def test_template_modified_after_lookup(self):
+        self._write('foo-42.jinja', 'custom', mtime_ns=0)
+        self.tpl_helper.get_customizable_template('foo', '42')
+
+        self._write('foo-42.jinja', 'modified', mtime_ns=10**18)
+
+        template = self.tpl_helper.get_customizable_template('foo', '42')
+        assert_that(template.dump({}), equal_to('modified'))
+
+
+class TestNewTemplateHelper(TestCase):
+    def test_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bytecode_cache_dir = os.path.join(tmp_dir, 'bytecode')
+            tpl_helper = new_template_helper(bytecode_cache_dir)
+
+            tpl_helper.get_template('asterisk/musiconhold')
+
+            assert_that(os.listdir(bytecode_cache_dir), has_length(1))
+
 
 class TestIVRTemplate(TestCase):
     def setUp(self):
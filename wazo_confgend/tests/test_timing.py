@@ -0,0 +1,105 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+import unittest
+
+from hamcrest import assert_that, equal_to, greater_than, has_entries, none
+from sqlalchemy import create_engine, text
+
+from .. import timing
+
+
+class TestRequestTimer(unittest.TestCase):
+    def test_phases_exclude_the_queries_run_during_them(self):
+        timer = timing.RequestTimer('resource/filename.conf')
+
+        with timer.measure('render') as m:
+            timer.add('db', 3600.0)
+            m.bytes = 42
+
+        summary = timer.summary()
+        assert_that(summary['render'], has_entries(seconds=0.0, count=1, bytes=42))
+        assert_that(summary['db'], has_entries(seconds=3600.0, count=1))
+
+    def test_format(self):
+        timer = timing.RequestTimer('resource/filename.conf')
+        timer.add('db', 0.25, count=3)
+        timer.add('write', 0.5, nbytes=12)
+
+        assert_that(
+            timer.format(),
+            equal_to(
+                'lookup=0.000 db=0.250 db_queries=3 render=0.000 cache=0.000'
+                ' write=0.500 write_bytes=12'
+            ),
+        )
+
+
+class TestTimingAggregates(unittest.TestCase):
+    def test_averages_over_the_window(self):
+        aggregates = timing.TimingAggregates(window=2)
+        for db in (10.0, 1.0, 3.0):
+            timer = timing.RequestTimer('resource/filename.conf')
+            timer.add('db', db)
+            timer.total = db
+            aggregates.add('resource/filename.conf', timer)
+
+        result = aggregates.get('resource/filename.conf')
+
+        assert_that(result, has_entries(requests=2, total=2.0))
+        assert_that(result['db'], has_entries(seconds=2.0, count=1))
+
+    def test_unknown_key(self):
+        aggregates = timing.TimingAggregates()
+
+        assert_that(aggregates.get('resource/filename.conf'), none())
+
+
+class TestMeasure(unittest.TestCase):
+    def test_without_timer(self):
+        with timing.measure('render') as m:
+            m.bytes = 42
+
+    def test_bind_runs_in_the_timed_request_of_the_caller(self):
+        timer = timing.RequestTimer('resource/filename.conf')
+
+        def render():
+            with timing.measure('render') as m:
+                m.bytes = 42
+
+        with timing.activate(timer):
+            f = timing.bind(render)
+        thread = threading.Thread(target=f)
+        thread.start()
+        thread.join()
+
+        assert_that(timer.summary()['render'], has_entries(count=1, bytes=42))
+
+
+class TestInstrumentQueries(unittest.TestCase):
+    def setUp(self):
+        timing.instrument_queries()
+        self.engine = create_engine('sqlite://')
+
+    def test_queries_are_accounted_to_the_timed_request(self):
+        timer = timing.RequestTimer('resource/filename.conf')
+
+        with self.engine.connect() as conn:
+            with timing.activate(timer):
+                conn.execute(text('SELECT 1'))
+                conn.execute(text('SELECT 2'))
+            conn.execute(text('SELECT 3'))
+
+        db = timer.summary()['db']
+        assert_that(db['count'], equal_to(2))
+        assert_that(db['seconds'], greater_than(0.0))
+
+    def test_instrumenting_twice_accounts_queries_once(self):
+        timing.instrument_queries()
+        timer = timing.RequestTimer('resource/filename.conf')
+
+        with self.engine.connect() as conn, timing.activate(timer):
+            conn.execute(text('SELECT 1'))
+
+        assert_that(timer.summary()['db']['count'], equal_to(1))
@@ -0,0 +1,192 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Per-phase timing of the served requests
+
+The phases of a request are the handler lookup, the database queries, the
+rendering of the content, the cache I/O and the write to the socket. The time
+of a phase excludes the database queries run during it, so that a slow file
+can be told DB-bound from CPU-bound.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PHASES = ('lookup', 'db', 'render', 'cache', 'write')
+DEFAULT_WINDOW = 100
+
+_QUERY_START_KEY = 'wazo_confgend_query_start'
+
+_current_timer = contextvars.ContextVar('current_timer', default=None)
+# called once per statement by the only cursor hooks of the process
+_query_observers = []
+_instrument_lock = threading.Lock()
+
+
+class Measure:
+    __slots__ = ('bytes',)
+
+    def __init__(self):
+        self.bytes = 0
+
+
+class RequestTimer:
+    def __init__(self, name):
+        self.name = name
+        self.total = None
+        self._start = time.perf_counter()
+        self._seconds = dict.fromkeys(PHASES, 0.0)
+        self._counts = dict.fromkeys(PHASES, 0)
+        self._bytes = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase, seconds, count=1, nbytes=0):
+        self._seconds[phase] += seconds
+        self._counts[phase] += count
+        self._bytes[phase] += nbytes
+
+    @contextlib.contextmanager
+    def measure(self, phase):
+        measure = Measure()
+        db_before = self._seconds['db']
+        start = time.perf_counter()
+        try:
+            yield measure
+        finally:
+            elapsed = time.perf_counter() - start
+            db = self._seconds['db'] - db_before
+            self.add(phase, max(elapsed - db, 0.0), nbytes=measure.bytes)
+
+    def stop(self):
+        self.total = time.perf_counter() - self._start
+
+    def summary(self):
+        return {
+            phase: {
+                'seconds': self._seconds[phase],
+                'count': self._counts[phase],
+                'bytes': self._bytes[phase],
+            }
+            for phase in PHASES
+        }
+
+    def format(self):
+        fields = []
+        for phase in PHASES:
+            fields.append(f'{phase}={self._seconds[phase]:.3f}')
+            if phase == 'db':
+                fields.append(f'db_queries={self._counts[phase]}')
+            elif self._bytes[phase]:
+                fields.append(f'{phase}_bytes={self._bytes[phase]}')
+        return ' '.join(fields)
+
+
+class TimingAggregates:
+    """Rolling averages of the last `window` requests of each resource/filename"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self._window = window
+        self._requests = defaultdict(self._new_window)
+        self._lock = threading.Lock()
+
+    def _new_window(self):
+        return deque(maxlen=self._window)
+
+    def add(self, key, timer):
+        with self._lock:
+            self._requests[key].append((timer.total, timer.summary()))
+
+    def get(self, key):
+        with self._lock:
+            requests = list(self._requests.get(key, ()))
+        if not requests:
+            return None
+
+        count = len(requests)
+        result = {
+            'requests': count,
+            'total': sum(total for total, _ in requests) / count,
+        }
+        for phase in PHASES:
+            result[phase] = {
+                field: sum(summary[phase][field] for _, summary in requests) / count
+                for field in ('seconds', 'count', 'bytes')
+            }
+        return result
+
+
+@contextlib.contextmanager
+def activate(timer):
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+def bind(f):
+    """Wrap f so that it runs in the timed request of the caller, if any"""
+    timer = _current_timer.get()
+    if timer is None:
+        return f
+    return functools.partial(_run_timed, timer, f)
+
+
+def _run_timed(timer, f, *args):
+    with activate(timer):
+        return f(*args)
+
+
+@contextlib.contextmanager
+def measure(phase, timer=None):
+    # a no-op when no request is being timed, e.g. when warming up the cache
+    if timer is None:
+        timer = _current_timer.get()
+    if timer is None:
+        yield Measure()
+        return
+
+    with timer.measure(phase) as m:
+        yield m
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_QUERY_START_KEY)
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    for observer in _query_observers:
+        observer(statement, seconds)
+
+
+def observe_queries(observer):
+    """Call observer(statement, seconds) after each statement of every engine"""
+    with _instrument_lock:
+        if observer not in _query_observers:
+            _query_observers.append(observer)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _add_query_time(statement, seconds):
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add('db', seconds)
+
+
+def instrument_queries():
+    """Account the queries of every engine to the request being timed"""
+    observe_queries(_add_query_time)